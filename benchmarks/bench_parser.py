@@ -0,0 +1,39 @@
+# -*- coding: utf8 -*-
+"""Small documents throughput: a new recovering parser per document (the previous behaviour)
+against reused parsers with and without recovery.
+
+    python -m benchmarks.bench_parser
+"""
+
+import timeit
+
+from lxml import etree
+
+from benchmarks.generator import generate_document
+from pyxmlmapper import base
+
+
+class Document(base.BaseXmlParser):
+    pass
+
+
+class StrictDocument(base.BaseXmlParser):
+    __parser_options__ = {"recover": False}
+
+
+def main(number=20000):
+    xml = generate_document(records=1, list_width=3)
+    cases = [
+        ("new parser, recover", lambda: etree.fromstring(xml, etree.XMLParser(recover=True))),
+        ("reused parser, recover", lambda: Document.parse(xml)),
+        ("reused parser, strict", lambda: StrictDocument.parse(xml)),
+    ]
+    baseline = None
+    for name, func in cases:
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        baseline = baseline or seconds
+        print("{:<25} {:>10.0f} docs/s  x{:.2f}".format(name, number / seconds, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+# -*- coding: utf8 -*-
+"""Model.map_many in a process pool against the serial Model.extract.
+
+    python -m benchmarks.bench_processes [workers]
+"""
+
+import os
+import sys
+import time
+
+from benchmarks.bench_threads import PurchaseOrder, xml
+
+
+def main(workers=None, documents=4000, chunksize=50):
+    workers = workers or os.cpu_count() or 1
+    sources = [xml.encode()] * documents
+
+    start = time.perf_counter()
+    serial = [PurchaseOrder.extract(source) for source in sources]
+    serial_seconds = time.perf_counter() - start
+    print("{:<22} {:>10.0f} docs/s".format("serial", documents / serial_seconds))
+
+    for ordered in (True, False):
+        start = time.perf_counter()
+        result = list(PurchaseOrder.map_many(sources, workers=workers, chunksize=chunksize, ordered=ordered))
+        seconds = time.perf_counter() - start
+        assert len(result) == len(serial)
+        print("{:<22} {:>10.0f} docs/s  x{:.2f}"
+              .format("{} workers{}".format(workers, "" if ordered else ", unordered"),
+                      documents / seconds, serial_seconds / seconds))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
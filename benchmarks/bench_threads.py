@@ -0,0 +1,56 @@
+# -*- coding: utf8 -*-
+"""Throughput of Model.map_concurrent from 1 to N threads.
+
+    python -m benchmarks.bench_threads [max_threads]
+"""
+
+import os
+import sys
+import time
+
+from pyxmlmapper import base
+
+item = """
+    <aw:Item aw:PartNumber="{0}-AA">
+      <aw:ProductName>Product {0}</aw:ProductName>
+      <aw:Quantity>{0}</aw:Quantity>
+      <aw:USPrice>{0}.95</aw:USPrice>
+    </aw:Item>"""
+
+xml = """
+<aw:PurchaseOrder aw:PurchaseOrderNumber="99503" xmlns:aw="http://www.adventure-works.com">
+  <aw:DeliveryNotes>Please leave packages in shed by driveway.</aw:DeliveryNotes>
+  <aw:Items>{}</aw:Items>
+</aw:PurchaseOrder>
+""".format("".join(item.format(i) for i in range(50)))
+
+
+class Item(base.BaseXmlParser):
+    product_name = base.ValueField("aw:ProductName")
+    part_number = base.ValueField("@aw:PartNumber")
+    quantity = base.ValueField("aw:Quantity", pytype=int)
+    us_price = base.ValueField("aw:USPrice", pytype=float)
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    number = base.ValueField("@aw:PurchaseOrderNumber", pytype=int)
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+    items = base.ListObjectField(".//aw:Item", Item)
+
+
+def main(max_threads=None, documents=2000):
+    max_threads = max_threads or os.cpu_count() or 1
+    sources = [xml] * documents
+    threads = 1
+    while True:
+        start = time.perf_counter()
+        PurchaseOrder.map_concurrent(sources, max_workers=threads, as_dict=True)
+        seconds = time.perf_counter() - start
+        print("{:>3} threads {:>10.0f} docs/s".format(threads, documents / seconds))
+        if threads >= max_threads:
+            break
+        threads = min(threads * 2, max_threads)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
@@ -0,0 +1,65 @@
+# -*- coding: utf8 -*-
+"""Scalar ValueField reads: the Selector based path against the fast path.
+Prints nanoseconds and peak traced bytes per read.
+
+    python -m benchmarks.bench_value_field
+"""
+
+import timeit
+import tracemalloc
+
+from lxml import etree
+
+from pyxmlmapper import base
+from pyxmlmapper.components.selector import Selector
+
+xml = """
+<PurchaseOrder PurchaseOrderNumber="99503">
+  <DeliveryNotes>Please leave packages in shed by driveway.</DeliveryNotes>
+  <Quantity>2</Quantity>
+</PurchaseOrder>
+"""
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    number = base.ValueField("@PurchaseOrderNumber")
+    delivery_notes = base.ValueField("DeliveryNotes")
+    delivery_notes_text = base.ValueField("DeliveryNotes/text()")
+    quantity = base.ValueField("Quantity", pytype=int)
+    missing = base.ValueField("Missing", default="default")
+
+
+def selector_value(field, doc):
+    """The previous implementation of XmlField.value"""
+    result = Selector(field.exec_query(doc), field._default)
+    return field.convert(field._pytype, getattr(result.first(), 'text', result.first()))
+
+
+def peak_bytes(func):
+    func()
+    tracemalloc.start()
+    if hasattr(tracemalloc, "reset_peak"):  # python 3.9+, the peak of a new trace starts from zero anyway
+        tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - baseline
+
+
+def main(number=50000):
+    doc = etree.fromstring(xml)
+    print("{:<20} {:>12} {:>12} {:>14} {:>14}".format("field", "before, ns", "after, ns", "before, bytes", "after, bytes"))
+    for name in ("number", "delivery_notes", "delivery_notes_text", "quantity", "missing"):
+        field = vars(PurchaseOrder)[name]
+        before = lambda: selector_value(field, doc)
+        after = lambda: field.value(doc)
+        assert before() == after()
+        before_ns = min(timeit.repeat(before, number=number, repeat=5)) / number * 1e9
+        after_ns = min(timeit.repeat(after, number=number, repeat=5)) / number * 1e9
+        print("{:<20} {:>12.0f} {:>12.0f} {:>14} {:>14}"
+              .format(name, before_ns, after_ns, peak_bytes(before), peak_bytes(after)))
+
+
+if __name__ == "__main__":
+    main()
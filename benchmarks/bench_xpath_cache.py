@@ -0,0 +1,96 @@
+# -*- coding: utf8 -*-
+"""Compares repeated field reads with a compiled XPath cache against compiling the query on every read.
+
+    python -m benchmarks.bench_xpath_cache
+"""
+
+import timeit
+
+from lxml import etree
+
+from pyxmlmapper import base
+
+xml = """
+<aw:PurchaseOrder aw:PurchaseOrderNumber="99503" aw:OrderDate="1999-10-20"
+    xmlns:aw="http://www.adventure-works.com">
+  <aw:Address aw:Type="Shipping">
+    <aw:Name>Ellen Adams</aw:Name>
+    <aw:City>Mill Valley</aw:City>
+  </aw:Address>
+  <aw:Address aw:Type="Billing">
+    <aw:Name>Tai Yee</aw:Name>
+    <aw:City>Old Town</aw:City>
+  </aw:Address>
+  <aw:DeliveryNotes>Please leave packages in shed by driveway.</aw:DeliveryNotes>
+  <aw:Items>
+    <aw:Item aw:PartNumber="872-AA">
+      <aw:ProductName>Lawnmower</aw:ProductName>
+      <aw:Quantity>1</aw:Quantity>
+      <aw:USPrice>148.95</aw:USPrice>
+    </aw:Item>
+    <aw:Item aw:PartNumber="926-AA">
+      <aw:ProductName>Baby Monitor</aw:ProductName>
+      <aw:Quantity>2</aw:Quantity>
+      <aw:USPrice>39.98</aw:USPrice>
+    </aw:Item>
+  </aw:Items>
+</aw:PurchaseOrder>
+"""
+
+
+class Address(base.BaseXmlParser):
+    __namespaces__ = {'aw': 'http://www.adventure-works.com'}
+
+    name = base.ValueField("aw:Name")
+    city = base.ValueField("aw:City")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    __namespaces__ = {'aw': 'http://www.adventure-works.com'}
+
+    number = base.ValueField("@aw:PurchaseOrderNumber", pytype=int)
+    address_shipping = base.ObjectField("aw:Address[@aw:Type='Shipping']", Address)
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+    prices = base.ListValueField(".//aw:USPrice", pytype=float)
+
+
+class AutoPurchaseOrder(base.BaseXmlParser):
+    number = base.ValueField("@aw:PurchaseOrderNumber", pytype=int)
+    address_shipping = base.ObjectField("aw:Address[@aw:Type='Shipping']", Address)
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+    prices = base.ListValueField(".//aw:USPrice", pytype=float)
+
+
+def read_fields(order):
+    return order.number, order.address_shipping.name, order.delivery_notes, order.prices.all()
+
+
+def read_fields_uncached(doc):
+    namespaces = {'aw': 'http://www.adventure-works.com'}
+    number = int(etree.XPath("@aw:PurchaseOrderNumber", namespaces=namespaces)(doc)[0])
+    address = etree.XPath("aw:Address[@aw:Type='Shipping']", namespaces=namespaces)(doc)[0]
+    name = etree.XPath("aw:Name", namespaces=namespaces)(address)[0].text
+    notes = etree.XPath("aw:DeliveryNotes", namespaces=namespaces)(doc)[0].text
+    prices = [float(item.text) for item in etree.XPath(".//aw:USPrice", namespaces=namespaces)(doc)]
+    return number, name, notes, prices
+
+
+def main(number=20000):
+    doc = etree.fromstring(xml)
+    order = PurchaseOrder(doc)
+    auto_order = AutoPurchaseOrder(doc)
+    assert read_fields(order) == read_fields_uncached(doc) == read_fields(auto_order)
+
+    results = [
+        ("compile on every read", timeit.timeit(lambda: read_fields_uncached(doc), number=number)),
+        ("cached, explicit namespaces", timeit.timeit(lambda: read_fields(order), number=number)),
+        ("cached, auto namespaces", timeit.timeit(lambda: read_fields(auto_order), number=number)),
+    ]
+    baseline = results[0][1]
+    for name, seconds in results:
+        print("{:<30} {:>8.3f} s  {:>6.2f} us/read  x{:.2f}"
+              .format(name, seconds, seconds / number * 1e6, baseline / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# -*- coding: utf8 -*-
+"""tag(), match() and lower() XPath functions: Python callbacks against the native XPath they are rewritten to.
+Prints milliseconds per query on a generated document.
+
+    python -m benchmarks.bench_xpath_functions
+"""
+
+import timeit
+
+from lxml import etree
+
+from benchmarks.generator import generate_document
+from pyxmlmapper.components.xpath_functions import rewrite
+
+queries = [
+    ".//*[tag()='Name']",
+    ".//*[match(tag(), 'Name', 'Title')]",
+    ".//*[lower(tag())='name']",
+]
+
+
+def main(records=1000, number=10):
+    doc = etree.fromstring(generate_document(records=records))
+    print("{:<40} {:>14} {:>14} {:>8}".format("query", "callback, ms", "native, ms", "speedup"))
+    for query in queries:
+        callback = etree.XPath(query)
+        native = etree.XPath(rewrite(query))
+        assert callback(doc) == native(doc)
+        callback_ms = min(timeit.repeat(lambda: callback(doc), number=number, repeat=5)) / number * 1e3
+        native_ms = min(timeit.repeat(lambda: native(doc), number=number, repeat=5)) / number * 1e3
+        print("{:<40} {:>14.2f} {:>14.2f} {:>8}".format(query, callback_ms, native_ms,
+                                                        "x{:.1f}".format(callback_ms / native_ms)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf8 -*-
+"""Compares two results of benchmarks.run.
+
+    python -m benchmarks.compare old.json new.json
+"""
+
+import json
+import sys
+
+
+def compare(old, new):
+    """:return list of (name, old seconds, new seconds, speedup)"""
+    rows = []
+    for name in sorted(set(old["results"]) | set(new["results"])):
+        old_seconds = old["results"].get(name, {}).get("seconds_per_op")
+        new_seconds = new["results"].get(name, {}).get("seconds_per_op")
+        speedup = old_seconds / new_seconds if old_seconds and new_seconds else None
+        rows.append((name, old_seconds, new_seconds, speedup))
+    return rows
+
+
+def main(old_filename, new_filename):
+    with open(old_filename) as fh:
+        old = json.load(fh)
+    with open(new_filename) as fh:
+        new = json.load(fh)
+    if old["meta"]["params"] != new["meta"]["params"]:
+        print("warning: runs have different params {} and {}".format(old["meta"]["params"], new["meta"]["params"]))
+    print("{:<30} {:>12} {:>12} {:>8}".format("benchmark", "old, us", "new, us", "speedup"))
+    for name, old_seconds, new_seconds, speedup in compare(old, new):
+        print("{:<30} {:>12} {:>12} {:>8}".format(
+            name,
+            "-" if old_seconds is None else "{:.2f}".format(old_seconds * 1e6),
+            "-" if new_seconds is None else "{:.2f}".format(new_seconds * 1e6),
+            "-" if speedup is None else "x{:.2f}".format(speedup)))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:3])
@@ -0,0 +1,70 @@
+# -*- coding: utf8 -*-
+"""Deterministic generator of synthetic documents for benchmarks.
+
+Document layout, prefixes of the tags are chosen round robin from `namespaces` namespaces
+(there are no prefixes if namespaces=0):
+
+    <p0:Root>
+      <p1:Record Id="0">
+        <p2:Name>Name 0</p2:Name>
+        <p0:Amount>0.5</p0:Amount>
+        <p1:Created>2021-01-01T00:00:00</p1:Created>
+        <p2:Values><p0:Value>0</p0:Value>...list_width values...</p2:Values>
+        <p1:Group><p2:Group>...depth levels...<p0:Leaf>0</p0:Leaf></p2:Group></p1:Group>
+      </p1:Record>
+      ...records...
+    </p0:Root>
+"""
+
+import random
+from datetime import datetime, timedelta
+
+TAGS = ("Root", "Record", "Name", "Amount", "Created", "Values", "Value", "Leaf")
+
+
+class Layout:
+    def __init__(self, depth=2, namespaces=1):
+        self.depth = depth
+        self.namespaces = {"p{}".format(i): "http://example.com/ns{}".format(i) for i in range(namespaces)}
+        self._prefixes = sorted(self.namespaces)
+
+    def tag(self, name, level=0):
+        """:return str
+        Tag with prefix, level is used for Group tags"""
+        index = TAGS.index(name) if name in TAGS else len(TAGS) + level
+        prefix = self._prefixes[index % len(self._prefixes)] if self._prefixes else None
+        return "{}:{}".format(prefix, name) if prefix else name
+
+    def declarations(self):
+        return "".join(' xmlns:{}="{}"'.format(prefix, ns) for prefix, ns in sorted(self.namespaces.items()))
+
+
+def generate_document(records=100, depth=2, namespaces=1, list_width=10, seed=0):
+    """:return str"""
+    rnd = random.Random(seed)
+    layout = Layout(depth, namespaces)
+    start = datetime(2021, 1, 1)
+    parts = ["<{}{}>".format(layout.tag("Root"), layout.declarations())]
+    for record in range(records):
+        parts.append('<{} Id="{}">'.format(layout.tag("Record"), record))
+        for name, value in (("Name", "Name {}".format(record)),
+                            ("Amount", "{:.2f}".format(rnd.uniform(0, 1000))),
+                            ("Created", (start + timedelta(hours=rnd.randrange(24 * 365))).isoformat())):
+            parts.append("<{0}>{1}</{0}>".format(layout.tag(name), value))
+        parts.append("<{}>".format(layout.tag("Values")))
+        for _ in range(list_width):
+            parts.append("<{0}>{1}</{0}>".format(layout.tag("Value"), rnd.randrange(1000)))
+        parts.append("</{}>".format(layout.tag("Values")))
+        groups = [layout.tag("Group", level) for level in range(depth)]
+        parts.extend("<{}>".format(tag) for tag in groups)
+        parts.append("<{0}>{1}</{0}>".format(layout.tag("Leaf"), rnd.randrange(1000)))
+        parts.extend("</{}>".format(tag) for tag in reversed(groups))
+        parts.append("</{}>".format(layout.tag("Record")))
+    parts.append("</{}>".format(layout.tag("Root")))
+    return "\n".join(parts)
+
+
+def generate_corpus(documents=10, seed=0, **kwargs):
+    """:return list of str
+    Documents of the same layout with different content"""
+    return [generate_document(seed=seed + i, **kwargs) for i in range(documents)]
@@ -0,0 +1,183 @@
+# -*- coding: utf8 -*-
+"""Benchmark suite, results are printed (or written) as JSON.
+
+    python -m benchmarks.run [--records 100] [--depth 2] [--namespaces 1] [--list-width 10] [--output result.json]
+    python -m benchmarks.compare old.json new.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+from lxml import etree
+
+from benchmarks.generator import Layout, generate_document
+from pyxmlmapper import base, xml2class
+
+interface = argparse.ArgumentParser(description="Runs pyxmlmapper benchmarks")
+interface.add_argument("--records", type=int, default=100, help="records in a document")
+interface.add_argument("--depth", type=int, default=2, help="nesting depth of groups in a record")
+interface.add_argument("--namespaces", type=int, default=1, help="number of namespaces in a document")
+interface.add_argument("--list-width", type=int, default=10, help="values in a record's list")
+interface.add_argument("--repeat", type=int, default=5, help="timing repeats, the best one is reported")
+interface.add_argument("--filter", default="", help="runs only benchmarks which names contain the string")
+interface.add_argument("--output", help="file to write results to, default - stdout")
+
+benchmarks = []
+
+
+def benchmark(number):
+    """Registers a benchmark, function accepts Context and returns the callable to be timed"""
+    def wrap(func):
+        benchmarks.append((func.__name__, number, func))
+        return func
+    return wrap
+
+
+class Context:
+    def __init__(self, records, depth, namespaces, list_width):
+        self.layout = Layout(depth, namespaces)
+        self.xml = generate_document(records=records, depth=depth, namespaces=namespaces, list_width=list_width)
+        self.doc = etree.fromstring(self.xml)
+        self.models = create_models(self.layout)
+        self.root = self.models["Root"](self.doc)
+        self.record = self.root.records.first()
+
+
+def create_models(layout):
+    """:return dict of model classes for the generated documents"""
+    tag = layout.tag
+    namespaces = layout.namespaces or {"auto": True}
+    leaf_path = "/".join([tag("Group", level) for level in range(layout.depth)] + [tag("Leaf")])
+    group = type("Group", (base.BaseXmlParser,), {
+        "__namespaces__": namespaces,
+        "leaf": base.ValueField(leaf_path.split("/", 1)[-1], pytype=int, default=0),
+    })
+    record = type("Record", (base.BaseXmlParser,), {
+        "__namespaces__": namespaces,
+        "id": base.ValueField("@Id", pytype=int),
+        "name": base.ValueField(tag("Name")),
+        "amount": base.ValueField(tag("Amount"), pytype=float),
+        "created": base.DateTimeField(tag("Created")),
+        "values": base.ListValueField("{}/{}".format(tag("Values"), tag("Value")), pytype=int),
+        "group": base.ObjectField(tag("Group", 0), group, default=group()),
+        "leaf": base.ValueField(leaf_path, pytype=int, default=0),
+    })
+    root = type("Root", (base.BaseXmlParser,), {
+        "__namespaces__": namespaces,
+        "records": base.ListObjectField(tag("Record"), record),
+        "names_by_tag": base.ListValueField(".//*[tag()='Name']"),
+        "names_by_match": base.ListValueField(".//*[match(tag(), 'Name', 'Title')]"),
+        "names_by_local_name": base.ListValueField(".//*[local-name()='Name']"),
+    })
+    return {"Root": root, "Record": record, "Group": group}
+
+
+@benchmark(number=20)
+def parse_document(ctx):
+    return lambda: ctx.models["Root"](ctx.xml)
+
+
+@benchmark(number=10000)
+def model_construction(ctx):
+    return lambda: ctx.models["Record"](ctx.doc)
+
+
+@benchmark(number=5000)
+def value_field(ctx):
+    return lambda: ctx.record.name
+
+
+@benchmark(number=5000)
+def value_field_int(ctx):
+    return lambda: ctx.record.amount
+
+
+@benchmark(number=2000)
+def list_value_field(ctx):
+    # the result is lazy, all() converts the values
+    return lambda: ctx.record.values.all()
+
+
+@benchmark(number=2000)
+def object_field(ctx):
+    return lambda: ctx.record.group.leaf
+
+
+@benchmark(number=20)
+def list_object_field(ctx):
+    return lambda: [record.id for record in ctx.root.records]
+
+
+@benchmark(number=2000)
+def datetime_field(ctx):
+    return lambda: ctx.record.created
+
+
+@benchmark(number=10)
+def xpath_tag_function(ctx):
+    return lambda: ctx.root.names_by_tag
+
+
+@benchmark(number=10)
+def xpath_match_function(ctx):
+    return lambda: ctx.root.names_by_match
+
+
+@benchmark(number=10)
+def xpath_tag_callback(ctx):
+    find = etree.XPath(".//*[tag()='Name']")
+    return lambda: find(ctx.doc)
+
+
+@benchmark(number=10)
+def xpath_local_name(ctx):
+    return lambda: ctx.root.names_by_local_name
+
+
+@benchmark(number=10)
+def extract(ctx):
+    return lambda: ctx.models["Root"].extract(ctx.doc)
+
+
+@benchmark(number=5)
+def create_classes_from_string(ctx):
+    return lambda: xml2class.create_classes_from_string(ctx.xml)
+
+
+def run(records=100, depth=2, namespaces=1, list_width=10, repeat=5, name_filter=""):
+    """:return dict"""
+    ctx = Context(records, depth, namespaces, list_width)
+    results = {}
+    for name, number, func in benchmarks:
+        if name_filter not in name:
+            continue
+        timer = timeit.Timer(func(ctx))
+        best = min(timer.repeat(repeat=repeat, number=number))
+        results[name] = {"seconds_per_op": best / number, "number": number, "repeat": repeat}
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "lxml": ".".join(map(str, etree.LXML_VERSION)),
+            "platform": platform.platform(),
+            "params": {"records": records, "depth": depth, "namespaces": namespaces, "list_width": list_width},
+        },
+        "results": results,
+    }
+
+
+def main():
+    args = interface.parse_args()
+    result = run(args.records, args.depth, args.namespaces, args.list_width, args.repeat, args.filter)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(result, fh, indent=2, sort_keys=True)
+    else:
+        json.dump(result, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+if __name__ == "__main__":
+    main()
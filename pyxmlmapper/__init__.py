@@ -3,3 +3,5 @@
 from .components import exceptions
 from .components import fields
 from .components import xpath_functions
+from .components import stats
+from .components import cache
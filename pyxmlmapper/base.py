@@ -1,23 +1,314 @@
 # -*- coding: utf8 -*-
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from copy import deepcopy
+from functools import partial
+from itertools import islice
 
 from .components.xpath_functions import *
 from .components.fields import *
 from .components.exceptions import *
+from .components.codegen import compile_extractor, compile_reader
+from .components.columns import ColumnsBuilder, ListColumn, NumericColumn, columns_plan
+from .components.parsers import get_parser, is_namespaced, strip_namespaces
+from .components import serialization
+from .components.cache import model_fingerprint
+from .components.projection import Projection, parse_projected
+from .components.sources import parse_bytes, parse_file, parse_stream, parse_tree
+from .components.streaming import aiter_elements, aparse_chunks, iter_elements
+
+
+def _extract_source(model, source, for_columns=False):
+    """:return result of the extractor of the model for the document (see BaseXmlParser.parse)
+    Results of strings, bytes and files are taken from __result_cache__ if it's set"""
+    extractor = model.columns_extractor() if for_columns else model.extractor()
+    cache = model.__result_cache__
+    if cache is not None and isinstance(source, os.PathLike):
+        with open(source, "rb") as fh:
+            source = fh.read()
+    if cache is None or not isinstance(source, (str, bytes, bytearray, memoryview)):
+        return extractor(None if source is None else model.parse(source))
+    variant = "columns" if for_columns else ""
+    return cache.extract(model, source, lambda: extractor(model.parse(source)), variant)
+
+
+def _extract_chunk(model, chunk):
+    return [_extract_source(model, source) for source in chunk]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
 
 
 class BaseXmlParser:
+    # {"prefix": "namespace", ...}, {"auto": True} - namespaces of the document or
+    # {"strip": True} - tags and attributes of documents are replaced with local names when they are loaded
     __namespaces__ = {"auto": True}
+    __cache_fields__ = False
+    # options of etree.XMLParser, options of subclasses are merged with the options of base classes
+    __parser_options__ = {"recover": True}
+    # bytes, files and streams are parsed keeping only the elements which the fields can reach,
+    # see components.projection
+    __prune_document__ = False
+    # components.cache.ResultCache of extracted results of documents (strings, bytes and files), see extract
+    __result_cache__ = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for attr in vars(cls).values():
+            if type(attr) is ValueField:
+                attr.value = compile_reader(attr)
 
     def __init__(self, doc=None):
         self.__xml_tree__ = None
+        self.__fields_cache__ = {}
+        self.__doc_namespaces__ = None
         if doc is not None:
             self.set_document(doc)
 
     def set_document(self, xml_string):
-        if not hasattr(xml_string, 'tag'):
-            self.__xml_tree__ = etree.fromstring(xml_string, etree.XMLParser(recover=True))
-        else:
-            self.__xml_tree__ = xml_string
+        self.__fields_cache__ = {}
+        self.__doc_namespaces__ = None
+        self.__xml_tree__ = self.parse(xml_string)
+
+    @classmethod
+    def parse(cls, xml_string):
+        """:return root element prepared for the fields of the model
+        xml_string - XML text (str), bytes-like object (possibly compressed), file path (os.PathLike) or element.
+        Documents are taken the same way by all the methods, a str is never a file path"""
+        if hasattr(xml_string, 'tag'):
+            if cls.__namespaces__.get('strip') and is_namespaced(xml_string):
+                # the element belongs to the caller (e.g. to the document of an outer model), a copy is stripped
+                return strip_namespaces(deepcopy(xml_string))
+            return xml_string
+        if isinstance(xml_string, os.PathLike):
+            return cls._loaded(parse_file(xml_string, *cls._source_parser()))
+        if isinstance(xml_string, (bytes, bytearray, memoryview)):
+            return cls._loaded(parse_bytes(xml_string, *cls._source_parser()))
+        return cls._loaded(etree.fromstring(xml_string, cls.xml_parser()))
+
+    @classmethod
+    def _loaded(cls, root):
+        """:return root of a parsed document prepared for the fields of the model"""
+        if root is not None and cls.__namespaces__.get('strip'):
+            strip_namespaces(root)
+        return root
+
+    @classmethod
+    def from_file(cls, path):
+        """:return model
+        The file is read by libxml2, gzip, bz2 and xz files are decompressed while parsing"""
+        return cls(cls._loaded(parse_file(path, *cls._source_parser())))
+
+    @classmethod
+    def from_bytes(cls, buffer):
+        """:return model
+        buffer - bytes, bytearray, memoryview or mmap, compressed data is decompressed while parsing.
+        The encoding is taken from the xml declaration"""
+        return cls(cls._loaded(parse_bytes(buffer, *cls._source_parser())))
+
+    @classmethod
+    def from_stream(cls, stream):
+        """:return model
+        stream - binary file object, compressed data is detected if the stream supports peek() or seek()"""
+        return cls(cls._loaded(parse_stream(stream, *cls._source_parser())))
+
+    @classmethod
+    def projection(cls):
+        """:return Projection or None if the queries of the model can't be analyzed
+        The projection is built once per class"""
+        if '__projection__' not in cls.__dict__:
+            setattr(cls, '__projection__', Projection.from_model(cls))
+        return cls.__dict__['__projection__']
+
+    @classmethod
+    def _source_parser(cls):
+        """:return (parser, parse function) for components.sources"""
+        projection = cls.projection() if cls.__prune_document__ else None
+        if projection is None or not projection.terminates:
+            # documents of models with list fields are read to the end, libxml2 builds the whole tree faster
+            return cls.xml_parser(), parse_tree
+        return cls.parser_options(), partial(parse_projected, projection=projection)
+
+    @classmethod
+    def parser_options(cls):
+        """:return dict
+        __parser_options__ of the class merged with the options of base classes"""
+        options = cls.__dict__.get('__parser_options_merged__')
+        if options is None:
+            options = {}
+            for klass in reversed(cls.__mro__):
+                options.update(vars(klass).get('__parser_options__', {}))
+            setattr(cls, '__parser_options_merged__', options)
+        return options
+
+    @classmethod
+    def xml_parser(cls):
+        """:return etree.XMLParser
+        Parser of the current thread configured with parser_options()"""
+        return get_parser(cls.parser_options())
+
+    @classmethod
+    def extraction_plan(cls):
+        """:return tuple of (attribute name, field) pairs
+        The plan is built once per class, fields of base classes go first"""
+        plan = cls.__dict__.get('__extraction_plan__')
+        if plan is None:
+            fields = {}
+            for klass in reversed(cls.__mro__):
+                for name, attr in vars(klass).items():
+                    if isinstance(attr, XmlField):
+                        fields[name] = attr
+                    elif name in fields:
+                        del fields[name]
+            plan = tuple(fields.items())
+            setattr(cls, '__extraction_plan__', plan)
+        return plan
+
+    @classmethod
+    def extractor(cls):
+        """:return function(doc, doc_namespaces=None)
+        Function generated for the extraction plan on first use, see components.codegen"""
+        extractor = cls.__dict__.get('__extractor__')
+        if extractor is None:
+            extractor = compile_extractor(cls, cls.extraction_plan(), cls._extract_fields)
+            setattr(cls, '__extractor__', extractor)
+        return extractor
+
+    @classmethod
+    def fingerprint(cls):
+        """:return str
+        Hash of the fields, nested models and options of the model, see components.cache.
+        The fingerprint is calculated once per class"""
+        fingerprint = cls.__dict__.get('__fingerprint__')
+        if fingerprint is None:
+            fingerprint = model_fingerprint(cls)
+            setattr(cls, '__fingerprint__', fingerprint)
+        return fingerprint
+
+    @classmethod
+    def extract(cls, doc):
+        """:return dict
+        Evaluates all the fields of the model at once and returns plain python structures.
+        Nested models are returned as dicts, no model instances are created.
+        doc - document, see parse. Results of strings, bytes and files are taken from __result_cache__ if it's set,
+        the document isn't parsed then"""
+        return _extract_source(cls, doc)
+
+    @classmethod
+    def _extract_fields(cls, doc, doc_namespaces=None, plan=None):
+        if doc_namespaces is None and doc is not None and cls.__namespaces__.get('auto'):
+            doc_namespaces = document_namespaces(doc)
+        return {name: field.extract(doc, doc_namespaces) for name, field in plan or cls.extraction_plan()}
+
+    @classmethod
+    def columns_extractor(cls):
+        """:return function(doc, doc_namespaces=None)
+        Extractor of to_columns, numeric ValueFields return columns.MISSING instead of their defaults"""
+        extractor = cls.__dict__.get('__columns_extractor__')
+        if extractor is None:
+            plan = columns_plan(cls.extraction_plan())
+            extractor = compile_extractor(cls, plan, partial(cls._extract_fields, plan=plan))
+            setattr(cls, '__columns_extractor__', extractor)
+        return extractor
+
+    @classmethod
+    def iterparse(cls, source, tag, as_dict=False):
+        """:return generator of models or dicts
+        Maps a document record by record without loading it whole.
+        source - XML text (str), bytes-like object, file path (os.PathLike) or binary file object.
+        tag - '{namespace}tag', 'prefix:tag' or 'tag'. Prefix is resolved with __namespaces__
+        or with the document namespaces if they are defined automatically.
+        A yielded model is valid until the next record is requested"""
+        for element in iter_elements(source, tag, cls.__namespaces__, cls.parser_options()):
+            element = cls._loaded(element)
+            yield cls.extract(element) if as_dict else cls(element)
+
+    @classmethod
+    async def afrom_chunks(cls, chunks, executor=None):
+        """:return model
+        chunks - async iterable (or iterable) of bytes, e.g. body of http response.
+        Chunks are parsed in the executor as they arrive (default executor of the loop if None)"""
+        return cls(cls._loaded(await aparse_chunks(chunks, cls.parser_options(), executor)))
+
+    @classmethod
+    async def aiterparse(cls, chunks, tag, as_dict=False, executor=None):
+        """:return async generator of models or dicts
+        Async version of iterparse for chunks of a document, a record is yielded as soon as it is received.
+        If as_dict, fields are extracted in the executor"""
+        loop = asyncio.get_running_loop()
+        async for element in aiter_elements(chunks, tag, cls.__namespaces__, cls.parser_options(), executor):
+            element = cls._loaded(element)
+            if as_dict:
+                yield await loop.run_in_executor(executor, cls.extract, element)
+            else:
+                yield cls(element)
+
+    @classmethod
+    def map_concurrent(cls, sources, executor=None, max_workers=None, as_dict=False):
+        """:return list of models or dicts in the order of sources
+        Parses documents (and extracts all the fields if as_dict) in a thread pool.
+        New ThreadPoolExecutor with max_workers is used if executor is not passed"""
+        map_source = cls.extract if as_dict else cls
+        if executor is not None:
+            return list(executor.map(map_source, sources))
+        with ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(map_source, sources))
+
+    @classmethod
+    def map_many(cls, sources, workers=None, chunksize=1, ordered=True):
+        """:return generator of dicts
+        Parses documents and extracts all the fields in worker processes.
+        sources - documents (see parse) which can be pickled: strings, bytes or file paths (os.PathLike),
+        the model class must be importable by the workers.
+        If not ordered, results are yielded as soon as a chunk of sources is processed"""
+        with ProcessPoolExecutor(workers) as executor:
+            if ordered:
+                yield from executor.map(partial(_extract_source, cls), sources, chunksize=chunksize)
+            else:
+                futures = [executor.submit(_extract_chunk, cls, chunk) for chunk in _chunks(sources, chunksize)]
+                for future in as_completed(futures):
+                    yield from future.result()
+
+    @classmethod
+    def to_columns(cls, sources, use_numpy=None):
+        """:return dict of column name to column
+        Extracts the fields of many documents (see parse) into columns:
+        int and float ValueField - NumericColumn(values, mask), list fields - ListColumn(offsets, values),
+        other fields - lists. Numeric arrays are NumPy arrays if NumPy is installed and use_numpy is not False.
+        A value is masked if it's not found, defaults of numeric ValueFields are not used"""
+        columns = ColumnsBuilder(cls.extraction_plan())
+        for source in sources:
+            columns.append(_extract_source(cls, source, for_columns=True))
+        return columns.build(use_numpy)
+
+    @classmethod
+    def iter_ndjson(cls, sources, fields=None, encoder=None):
+        """:return generator of str
+        Chunks of NDJSON text of many documents (see parse), a line per document.
+        Documents are loaded one by one and written without building dicts, see dump_json"""
+        return serialization.iter_ndjson(cls, map(cls.parse, sources), fields, encoder)
+
+    @classmethod
+    def dump_ndjson(cls, fp, sources, fields=None, encoder=None):
+        """Writes NDJSON of many documents to text file object fp, see iter_ndjson"""
+        fp.writelines(cls.iter_ndjson(sources, fields, encoder))
+
+    def to_dict(self):
+        return self.extract(self.document)
+
+    def dump_json(self, fp, fields=None, encoder=None):
+        """Writes the fields of the model to text file object fp as JSON, the same as json.dump(self.to_dict(), fp)
+        but list items are converted and written one by one.
+        fields - names of the fields to write, fields of nested models are selected with dotted names ('items.price').
+        encoder - json.JSONEncoder, default one writes datetime values in ISO 8601 format and Decimal as strings"""
+        for chunk in serialization.iter_json(type(self), self.document, fields, encoder):
+            fp.write(chunk)
 
     @property
     def raw_xml(self):
@@ -26,3 +317,10 @@ class BaseXmlParser:
     @property
     def document(self):
         return self.__xml_tree__
+
+    @property
+    def doc_namespaces(self):
+        """Namespaces of the document for the fields with automatic namespaces, calculated once per document"""
+        if self.__doc_namespaces__ is None:
+            self.__doc_namespaces__ = document_namespaces(self.document)
+        return self.__doc_namespaces__
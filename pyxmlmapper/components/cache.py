@@ -0,0 +1,209 @@
+"""Cache of extracted results, see BaseXmlParser.__result_cache__.
+
+    class PurchaseOrder(base.BaseXmlParser):
+        __result_cache__ = cache.ResultCache(cache.SqliteStorage("results.db"), maxsize=1024)
+
+Results of Model.extract() are stored by the hash of the document bytes and the fingerprint of the model.
+The fingerprint is calculated from the queries, types, defaults and options of the fields (nested models
+included), namespaces and parser options of the model, so results of a changed model are not found.
+Results are pickled: a result taken from the cache is an independent copy, storages keep bytes only.
+A storage is read by the same application which writes it, don't use storages from untrusted sources.
+"""
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import types
+from collections import OrderedDict
+from functools import partial
+
+from dateutil import parser as date_parser
+
+# changes of extraction semantics increment the version, results of previous versions are not found
+FORMAT_VERSION = 1
+
+# attributes of fields which don't affect extracted values
+_IGNORED_ATTRIBUTES = {'value', '_parse_date', '_owner_name', '_cache'}
+# default repr of objects, it differs between processes
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+def describe_constant(value):
+    """:return str
+    Description of a constant of compiled code, nested code objects are replaced with their digests"""
+    if isinstance(value, types.CodeType):
+        return code_digest(value)
+    if isinstance(value, tuple):
+        return "({})".format(", ".join(map(describe_constant, value)))
+    if isinstance(value, frozenset):
+        # the order of items depends on the hash seed of the process
+        return "frozenset({{{}}})".format(", ".join(sorted(map(describe_constant, value))))
+    return repr(value)
+
+
+def code_digest(code):
+    """:return str
+    Hash of the instructions, names and constants of the code, the same in every process"""
+    description = "{!r}\n{}\n{}".format(code.co_code, code.co_names, describe_constant(code.co_consts))
+    return hashlib.blake2b(description.encode(), digest_size=8).hexdigest()
+
+
+def describe(value, seen):
+    """:return str
+    Description of a field attribute which is the same in every process for equal values"""
+    if hasattr(value, 'extraction_plan'):
+        if isinstance(value, type):
+            return model_description(value, seen)
+        return "instance of " + model_description(type(value), seen)
+    if isinstance(value, date_parser.parserinfo):
+        return "parserinfo(dayfirst={}, yearfirst={})".format(value.dayfirst, value.yearfirst)
+    if isinstance(value, dict):
+        return "{{{}}}".format(", ".join("{!r}: {}".format(key, describe(item, seen))
+                                         for key, item in sorted(value.items(), key=repr)))
+    if isinstance(value, (list, tuple)):
+        return "{}({})".format(type(value).__name__, ", ".join(describe(item, seen) for item in value))
+    if isinstance(value, partial):
+        return "partial(func={}, args={}, keywords={})".format(
+            describe(value.func, seen), describe(value.args, seen), describe(value.keywords, seen))
+    code = getattr(value, '__code__', None)
+    if code is not None:
+        name = "{}.{}".format(value.__module__, value.__qualname__)
+        if value in seen:
+            return name  # recursive function
+        seen.add(value)
+        # functions with the same name and different code (e.g. lambdas) or different captured values
+        closure = [cell.cell_contents for cell in getattr(value, '__closure__', None) or ()]
+        return "{} {} defaults={} closure={}".format(
+            name, code_digest(code), describe(getattr(value, '__defaults__', None), seen), describe(closure, seen))
+    if isinstance(value, type) or (callable(value) and hasattr(value, '__qualname__')):
+        return "{}.{}".format(getattr(value, '__module__', ''), value.__qualname__)
+    return repr(value)
+
+
+def model_description(model, seen):
+    name = "{}.{}".format(model.__module__, model.__qualname__)
+    if model in seen:
+        return name
+    seen.add(model)
+    lines = [name, describe(model.__namespaces__, seen), describe(model.parser_options(), seen)]
+    for attr_name, field in model.extraction_plan():
+        attributes = ", ".join("{}={}".format(key, describe(item, seen)) for key, item in sorted(vars(field).items())
+                               if key not in _IGNORED_ATTRIBUTES)
+        lines.append("{}: {}({})".format(attr_name, type(field).__qualname__, attributes))
+    return "\n".join(lines)
+
+
+def model_fingerprint(model):
+    """:return str
+    Hash of the model description, it changes if a field, a nested model or an option is changed.
+    Raises ValueError if the description contains an object address: results of another object at the same address
+    in another process could be taken from a storage, define __repr__ of such objects"""
+    description = "{}\n{}".format(FORMAT_VERSION, model_description(model, set()))
+    for line in description.splitlines():
+        if _ADDRESS.search(line):
+            raise ValueError("{} has no description which is the same in every process: {}"
+                             .format(model.__name__, line))
+    return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+
+def document_hash(document):
+    """:return str
+    document - bytes, bytes-like object or str"""
+    if isinstance(document, str):
+        document = document.encode("utf8")
+    return hashlib.blake2b(document, digest_size=20).hexdigest()
+
+
+class SqliteStorage:
+    """Storage of cached results in sqlite database, threads and processes use their own connections"""
+    def __init__(self, path, timeout=30.0):
+        self.path = os.fspath(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)")
+            connection.commit()
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key):
+        """:return bytes or None"""
+        row = self._connection().execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key, value):
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, value))
+
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM results")
+
+
+class ResultCache:
+    """In-process LRU cache of maxsize results in front of an optional storage.
+    storage - object with get(key) -> bytes or None and set(key, bytes) methods, e.g. SqliteStorage"""
+    def __init__(self, storage=None, maxsize=1024):
+        self.storage = storage
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._recent = OrderedDict()
+
+    def key(self, model, document, variant=""):
+        """variant - kind of the result, e.g. 'columns' for the results of Model.columns_extractor"""
+        return "{}{}:{}".format(model.fingerprint(), variant, document_hash(document))
+
+    def _get(self, key):
+        with self._lock:
+            value = self._recent.get(key)
+            if value is not None:
+                self._recent.move_to_end(key)
+                return value
+        if self.storage is not None:
+            value = self.storage.get(key)
+            if value is not None:
+                self._remember(key, value)
+        return value
+
+    def _remember(self, key, value):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._recent[key] = value
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.maxsize:
+                self._recent.popitem(last=False)
+
+    def extract(self, model, document, extract, variant=""):
+        """:return extracted result of the model for the document
+        extract() is called if the result is not cached"""
+        key = self.key(model, document, variant)
+        value = self._get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if value is not None:
+            return pickle.loads(value)
+        result = extract()
+        value = pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+        self._remember(key, value)
+        if self.storage is not None:
+            self.storage.set(key, value)
+        return result
+
+    def clear(self):
+        """Clears the in-process cache, the storage is not changed"""
+        with self._lock:
+            self._recent.clear()
@@ -0,0 +1,180 @@
+"""Generated extractors of models.
+
+Model.extract() runs a function generated once per model class, the function evaluates all the fields inline:
+compiled XPath objects are taken from the thread cache by precomputed keys, conversions of ValueField
+and ListValueField are called directly, other fields are called through their extract method.
+ValueField descriptors read values with a generated function of the same kind.
+
+Generated source is available as function.source, it is printed to stderr when the function is created
+if `codegen.dump_source` is set (PYXMLMAPPER_DUMP_SOURCE=1 environment variable).
+While statistics are enabled the generated functions call the fields as usual.
+"""
+import linecache
+import os
+import sys
+from itertools import count
+
+from . import stats
+from .exceptions import NotFoundException
+from .fields import ListValueField, ValueField, _thread_xpath_cache, compile_query, document_namespaces
+from .mixins import TypeCastMixin
+
+dump_source = bool(os.environ.get("PYXMLMAPPER_DUMP_SOURCE"))
+
+_counter = count()
+
+
+class _Source:
+    def __init__(self):
+        self.lines = []
+        self.constants = {
+            "stats": stats,
+            "thread_cache": _thread_xpath_cache,
+            "compile_query": compile_query,
+            "document_namespaces": document_namespaces,
+            "convert": TypeCastMixin.convert,
+            "NotFoundException": NotFoundException,
+            "missing": object(),
+        }
+
+    def const(self, value, prefix):
+        """:return name of the variable bound to the value in the generated function"""
+        name = "{}_{}".format(prefix, len(self.constants))
+        self.constants[name] = value
+        return name
+
+    def add(self, indent, *lines):
+        self.lines.extend("    " * indent + line for line in lines)
+
+    def compile(self, func_name, title):
+        source = "\n".join(self.lines) + "\n"
+        filename = "<pyxmlmapper {} {}>".format(title, next(_counter))
+        linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+        namespace = dict(self.constants)
+        exec(compile(source, filename, "exec"), namespace)
+        func = namespace[func_name]
+        func.source = source
+        if dump_source:
+            sys.stderr.write("# {}\n{}\n".format(title, source))
+        return func
+
+
+def is_inlined(field):
+    return type(field) in (ValueField, ListValueField)
+
+
+def _uses_document_namespaces(fields):
+    return any(is_inlined(field) and field._namespaces.get('auto') for field in fields)
+
+
+def _add_namespaces(src, indent):
+    src.add(indent,
+            "if doc_namespaces is None:",
+            "    doc_namespaces = document_namespaces(doc)",
+            "doc_ns_key = tuple(sorted(doc_namespaces.items()))")
+
+
+def _add_query(src, indent, field):
+    smart_strings = field._smart_strings
+    query = src.const(field._query, "query")
+    if field._namespaces.get('auto'):
+        key = "({}, doc_ns_key, {})".format(query, smart_strings)
+        namespaces = "doc_namespaces"
+    else:
+        key = src.const((field._query, tuple(sorted(field._namespaces.items())), smart_strings), "key")
+        namespaces = src.const(field._namespaces, "namespaces")
+    src.add(indent,
+            "find = queries.get({})".format(key),
+            "if find is None:",
+            "    find = compile_query({}, {}, {})".format(query, namespaces, smart_strings),
+            "result = find(doc)")
+    if field._strict:
+        src.add(indent,
+                "if type(result) is list and not result:",
+                "    raise NotFoundException")
+
+
+def _add_value(src, indent, field, target):
+    # the same as XmlField.value
+    pytype = src.const(field._pytype, "pytype")
+    _add_query(src, indent, field)
+    src.add(indent,
+            "if type(result) is list:",
+            "    result = result[0] if result else missing",
+            "if result is missing:",
+            "    {} = {}".format(target, src.const(field._default, "default")))
+    if field._pytype is str:
+        src.add(indent,
+                "elif type(result) is str:",
+                "    {} = result".format(target),
+                "else:",
+                "    {} = convert(str, getattr(result, 'text', result))".format(target))
+    else:
+        src.add(indent,
+                "else:",
+                "    if type(result) is not str:",
+                "        result = getattr(result, 'text', result)",
+                "    try:",
+                "        {} = {}(result)".format(target, pytype),
+                "    except Exception:",
+                "        {} = convert({}, result)".format(target, pytype))
+
+
+def _add_values_list(src, indent, field, target):
+    # the same as XmlField.values_plain_list
+    pytype = src.const(field._pytype, "pytype")
+    _add_query(src, indent, field)
+    src.add(indent,
+            "try:",
+            "    {} = [{}(getattr(item, 'text', item)) for item in result]".format(target, pytype),
+            "except Exception:",
+            "    {} = [convert({}, getattr(item, 'text', item)) for item in result]".format(target, pytype))
+
+
+def _add_field(src, indent, field, target):
+    if type(field) is ValueField:
+        _add_value(src, indent, field, target)
+    elif type(field) is ListValueField:
+        _add_values_list(src, indent, field, target)
+    else:
+        src.add(indent, "{} = {}(doc, doc_namespaces)".format(target, src.const(field.extract, "extract")))
+
+
+def compile_extractor(model, plan, fallback):
+    """:return function(doc, doc_namespaces=None) which returns dict of the fields of the plan
+    plan - tuple of (attribute name, field) pairs, fallback(doc, doc_namespaces) is called for None document
+    and while statistics are enabled"""
+    src = _Source()
+    fields = [field for _, field in plan]
+    src.add(0,
+            "def extract(doc, doc_namespaces=None):",
+            "    if doc is None or stats.enabled:",
+            "        return {}(doc, doc_namespaces)".format(src.const(fallback, "fallback")),
+            "    queries = thread_cache()")
+    if _uses_document_namespaces(fields):
+        _add_namespaces(src, 1)
+    targets = []
+    for index, (name, field) in enumerate(plan):
+        target = "value_{}".format(index)
+        src.add(1, "# {}".format(name))
+        _add_field(src, 1, field, target)
+        targets.append("{!r}: {}".format(name, target))
+    src.add(1, "return {{{}}}".format(", ".join(targets)))
+    return src.compile("extract", "extractor of {}.{}".format(model.__module__, model.__qualname__))
+
+
+def compile_reader(field):
+    """:return function(doc, doc_namespaces=None) which returns the value of ValueField
+    It replaces XmlField.value of the field instance"""
+    src = _Source()
+    generic = src.const(ValueField.value.__get__(field), "generic")
+    src.add(0,
+            "def read(doc, doc_namespaces=None):",
+            "    if doc is None or stats.enabled:",
+            "        return {}(doc, doc_namespaces)".format(generic),
+            "    queries = thread_cache()")
+    if _uses_document_namespaces([field]):
+        _add_namespaces(src, 1)
+    _add_value(src, 1, field, "value")
+    src.add(1, "return value")
+    return src.compile("read", "reader of {}".format(field.stats_name))
@@ -0,0 +1,144 @@
+"""Columnar extraction of many documents, see BaseXmlParser.to_columns.
+
+Numeric (int, float) values of ValueField are collected into array.array (NumPy arrays if NumPy is installed)
+with a mask of values which are not found, values of list fields are collected into one list (or numeric array)
+with offsets, other values are collected into lists. Integers out of the 64-bit range turn the column into
+a list of python ints (NumPy array of objects).
+"""
+import copy
+from array import array
+from collections import namedtuple
+
+from .fields import ListDateTimeField, ListObjectField, ListValueField, ValueField
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# mask[i] is True if the value of i-th document is not found, values[i] is 0 then
+NumericColumn = namedtuple("NumericColumn", "values mask")
+# values of i-th document are values[offsets[i]:offsets[i + 1]]
+ListColumn = namedtuple("ListColumn", "offsets values")
+
+_TYPECODES = {int: "q", float: "d"}
+
+
+class _Missing:
+    """Value of a numeric field which is not found, it's pickled by reference"""
+    def __repr__(self):
+        return "MISSING"
+
+    def __reduce__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+def is_numeric(field):
+    return type(field) is ValueField and field._pytype in _TYPECODES
+
+
+def columns_plan(plan):
+    """:return extraction plan where numeric ValueFields return MISSING instead of their defaults"""
+    result = []
+    for name, field in plan:
+        if is_numeric(field):
+            field = copy.copy(field)
+            field.__dict__.pop('value', None)  # generated reader returns the default of the original field
+            field._default = MISSING
+        result.append((name, field))
+    return tuple(result)
+
+
+def _to_numpy(values):
+    if not isinstance(values, array):
+        return numpy.array(values, dtype=object)
+    return numpy.frombuffer(values, dtype=values.typecode) if len(values) else numpy.array([], values.typecode)
+
+
+class ValuesBuilder:
+    def __init__(self):
+        self.values = []
+
+    def append(self, value):
+        self.values.append(value)
+
+    def build(self, use_numpy):
+        return self.values
+
+
+class NumericBuilder:
+    def __init__(self, pytype):
+        self.pytype = pytype
+        self.values = array(_TYPECODES[pytype])
+        self.mask = array("B")
+
+    def append(self, value):
+        if value is MISSING:
+            self.values.append(0)
+            self.mask.append(1)
+            return
+        try:
+            self.values.append(value)
+        except OverflowError:
+            self.values = list(self.values)
+            self.values.append(value)
+        self.mask.append(0)
+
+    def build(self, use_numpy):
+        if use_numpy:
+            return NumericColumn(_to_numpy(self.values), _to_numpy(self.mask).view(bool))
+        return NumericColumn(self.values, self.mask)
+
+
+class ListBuilder:
+    def __init__(self, pytype=None):
+        self.offsets = array("q", [0])
+        self.values = array(_TYPECODES[pytype]) if pytype in _TYPECODES else []
+
+    def append(self, values):
+        try:
+            self.values.extend(values)
+        except OverflowError:
+            # array keeps the items appended before the error
+            self.values = list(self.values[:self.offsets[-1]])
+            self.values.extend(values)
+        self.offsets.append(len(self.values))
+
+    def build(self, use_numpy):
+        if not use_numpy:
+            return ListColumn(self.offsets, self.values)
+        values = _to_numpy(self.values) if isinstance(self.values, array) else self.values
+        return ListColumn(_to_numpy(self.offsets), values)
+
+
+def column_builder(field):
+    """:return builder of the column for the field"""
+    if is_numeric(field):
+        return NumericBuilder(field._pytype)
+    if isinstance(field, ListValueField):
+        return ListBuilder(field._pytype)
+    if isinstance(field, (ListObjectField, ListDateTimeField)):
+        return ListBuilder()
+    return ValuesBuilder()
+
+
+class ColumnsBuilder:
+    """Collects rows extracted with the plan into columns"""
+    def __init__(self, plan):
+        self.builders = [(name, column_builder(field)) for name, field in plan]
+
+    def append(self, row):
+        for name, builder in self.builders:
+            builder.append(row[name])
+
+    def build(self, use_numpy=None):
+        """:return dict of column name to column
+        use_numpy - None to use NumPy if it's installed, True raises ImportError if it's not"""
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("NumPy is required for use_numpy=True, install pyxmlmapper[numpy]")
+        return {name: builder.build(use_numpy) for name, builder in self.builders}
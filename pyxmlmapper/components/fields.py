@@ -1,111 +1,328 @@
 import logging
+import threading
+from datetime import datetime
+from functools import lru_cache
+from time import perf_counter
 
 from dateutil import parser as date_parser
 from lxml import etree
 
+from . import stats
+from .common import Default
 from .exceptions import NotFoundException
 from .mixins import TypeCastMixin
-from .selector import Selector
+from .selector import LazyMapping, LazySelector, Selector
+from .xpath_functions import rewrite
 
 logger = logging.getLogger(__name__)
 
+_xpath_cache = threading.local()
+
+
+def _thread_xpath_cache():
+    # compiled XPath serializes its evaluations with a lock, so every thread has its own copies
+    try:
+        return _xpath_cache.queries
+    except AttributeError:
+        _xpath_cache.queries = {}
+        return _xpath_cache.queries
+
+
+def compile_query(query, namespaces, smart_strings=True):
+    """:return etree.XPath
+    Returns compiled XPath for the query, compiles it only once per query and namespaces map in a thread.
+    If not smart_strings, string results are plain str without reference to their parent element.
+    Calls of tag(), match() and lower() are replaced with native XPath, see xpath_functions.rewrite"""
+    cache = _thread_xpath_cache()
+    key = (query, tuple(sorted(namespaces.items())), smart_strings)
+    find = cache.get(key)
+    if find is None:
+        find = cache[key] = etree.XPath(rewrite(query), namespaces=namespaces, smart_strings=smart_strings)
+    return find
+
+
+def document_namespaces(doc):
+    """:return dict
+    Namespaces declared for the element, default namespace gets 'ns' prefix"""
+    if doc is None:
+        return {}
+    namespaces = doc.nsmap
+    if None in namespaces:
+        namespaces['ns'] = namespaces.pop(None)
+    return namespaces
+
 
 class XmlField(TypeCastMixin):
-    def __init__(self, query, pytype=str, default="", strict=False):
+    _attr_name = None
+    _owner_name = None
+    _namespaces = {"auto": True}
+    # fields which read only scalar values don't need string results bound to elements
+    _smart_strings = True
+
+    def __init__(self, query, pytype=str, default="", strict=False, cache=None):
 
         self._query = query
         self._default = default
         self._pytype = pytype
         self._strict = strict
+        self._cache = cache
 
     def __set_name__(self, owner, name):
         self._attr_name = name
+        self._owner_name = owner.__name__
         self._namespaces = getattr(owner, '__namespaces__')
+        if self._namespaces.get('strip'):
+            self._namespaces = {}  # documents of the model have no namespaces
+        if not self._namespaces.get('auto'):
+            try:
+                compile_query(self._query, self._namespaces, self._smart_strings)
+            except etree.XPathSyntaxError:
+                pass  # the error is raised when the field is accessed
+
+    def cached(self, instance, method):
+        """:return field value
+        Returns value stored for the instance if caching is enabled for the field
+        (or for the model by __cache_fields__) otherwise calculates it with method(document, doc_namespaces)"""
+        cache = self._cache if self._cache is not None else getattr(instance, '__cache_fields__', False)
+        if not cache:
+            return method(instance.document, self.instance_namespaces(instance))
+        fields_cache = instance.__fields_cache__
+        if stats.enabled:
+            stats.record_cache(self.stats_name, self._attr_name in fields_cache)
+        if self._attr_name not in fields_cache:
+            fields_cache[self._attr_name] = method(instance.document, self.instance_namespaces(instance))
+        return fields_cache[self._attr_name]
+
+    @property
+    def stats_name(self):
+        return "{}.{}".format(self._owner_name, self._attr_name) if self._attr_name else self._query
+
+    def instance_namespaces(self, instance):
+        """:return dict or None
+        Document namespaces of the model instance if the field uses them"""
+        return instance.doc_namespaces if self._namespaces.get('auto') else None
+
+    def resolve_namespaces(self, doc, doc_namespaces=None):
+        if doc is None:
+            return {}
+        if self._namespaces.get('auto'):
+            return document_namespaces(doc) if doc_namespaces is None else doc_namespaces
+        return self._namespaces
 
-    def exec_query(self, doc):
-        self._set_doc_namespaces(doc)
-        find = etree.XPath(self._query, namespaces=self._namespaces)
-        result = [] if doc is None else find(doc)
-        if len(result) == 0 and self._strict:
+    def exec_query(self, doc, doc_namespaces=None, smart_strings=True):
+        """:return list of found nodes or a scalar value for expressions like string(...) or count(...)"""
+        if doc is None:
+            result = []
+        elif stats.enabled:
+            start = perf_counter()
+            result = compile_query(self._query, self.resolve_namespaces(doc, doc_namespaces), smart_strings)(doc)
+            stats.record_query(self.stats_name, perf_counter() - start, len(result) if type(result) is list else 1)
+        else:
+            result = compile_query(self._query, self.resolve_namespaces(doc, doc_namespaces), smart_strings)(doc)
+        if self._strict and type(result) is list and not result:
             raise NotFoundException
         return result
 
-    def value(self, doc):
-        result = Selector(self.exec_query(doc), self._default)
-        return self.convert(self._pytype, getattr(result.first(), 'text', result.first()))
+    def convert(self, _type, value):
+        if not stats.enabled:
+            return TypeCastMixin.convert(_type, value)
+        start = perf_counter()
+        try:
+            return TypeCastMixin.convert(_type, value)
+        finally:
+            stats.record_conversion(self.stats_name, perf_counter() - start)
+
+    def value(self, doc, doc_namespaces=None):
+        # the hot path of scalar fields: no Selector and Default objects,
+        # attributes, text() and string() results are plain strings
+        result = self.exec_query(doc, doc_namespaces, smart_strings=False)
+        if type(result) is list:
+            if not result:
+                return self._default
+            result = result[0]
+        if type(result) is str:
+            return result if self._pytype is str else self.convert(self._pytype, result)
+        return self.convert(self._pytype, getattr(result, 'text', result))
 
-    def object(self, doc):
-        result = Selector(self.exec_query(doc), self._default)
+    def object(self, doc, doc_namespaces=None):
+        result = Selector(self.exec_query(doc, doc_namespaces), self._default)
         return self.convert(self._pytype, result.first())
 
-    def values_list(self, doc):
-        query_result = self.exec_query(doc)
-        result = [self.convert(self._pytype, getattr(item, 'text', item)) for item in query_result]
-        return Selector(result, self._default)
+    def values_list(self, doc, doc_namespaces=None):
+        """:return LazySelector, found values are converted on demand"""
+        return LazySelector(self.exec_query(doc, doc_namespaces), self._convert_value, self._default)
 
-    def objects_list(self, doc):
-        query_result = self.exec_query(doc)
-        result = [self.convert(self._pytype, item) for item in query_result]
-        return Selector(result, self._default)
+    def objects_list(self, doc, doc_namespaces=None):
+        """:return LazySelector, found nodes are converted on demand"""
+        return LazySelector(self.exec_query(doc, doc_namespaces), self._convert_object, self._default)
 
-    def _set_doc_namespaces(self, doc):
-        if doc is None:
-            self._namespaces = {}
-            return
-        if self._namespaces.get('auto'):
-            self._namespaces = doc.nsmap
-            if None in self._namespaces:
-                ns = self._namespaces.pop(None)
-                self._namespaces['ns'] = ns
+    def _convert_value(self, item):
+        return self.convert(self._pytype, getattr(item, 'text', item))
+
+    def _convert_object(self, item):
+        return self.convert(self._pytype, item)
+
+    def object_dict(self, doc, doc_namespaces=None):
+        result = Selector(self.exec_query(doc, doc_namespaces), self._default).first()
+        if isinstance(result, Default):
+            to_dict = getattr(result.value, 'to_dict', None)
+            return to_dict() if to_dict else result.value
+        return self._extract_object(result)
+
+    def objects_dicts(self, doc, doc_namespaces=None):
+        return [self._extract_object(item) for item in self.exec_query(doc, doc_namespaces)]
+
+    def values_plain_list(self, doc, doc_namespaces=None):
+        return [self._convert_value(item) for item in self.exec_query(doc, doc_namespaces)]
+
+    def extract(self, doc, doc_namespaces=None):
+        """:return plain python value of the field, nested models are returned as dicts"""
+        return self.value(doc, doc_namespaces)
+
+    def _extract_object(self, element):
+        extract = getattr(self._pytype, 'extract', None)
+        return extract(element) if extract else self.convert(self._pytype, element)
 
     @staticmethod
     def _to_string(doc):
         return etree.tostring(doc, pretty_print=True)
 
 
-def __get_decorator(method):
+def __get_decorator(method, extract_method):
     def get(self, instance, owner):
-        call = getattr(self, method)
-        return call(instance.document) if instance else self
+        if not instance:
+            return self
+        return self.cached(instance, getattr(self, method))
 
     def wrap(cls):
         cls.__get__ = get
+        cls.extract = getattr(cls, extract_method)
         return cls
 
     return wrap
 
 
-@__get_decorator("value")
-class ValueField(XmlField): pass
+@__get_decorator("value", "value")
+class ValueField(XmlField):
+    _smart_strings = False
 
 
-@__get_decorator("values_list")
+@__get_decorator("values_list", "values_plain_list")
 class ListValueField(XmlField): pass
 
 
-@__get_decorator("object")
+@__get_decorator("object", "object_dict")
 class ObjectField(XmlField): pass
 
 
-@__get_decorator("objects_list")
+@__get_decorator("objects_list", "objects_dicts")
 class ListObjectField(XmlField): pass
 
 
+class MapField(XmlField):
+    """Mapping of keys to objects found by the query, the index is built once per document (the field is cached
+    by default). key - XPath query relative to a found node, nodes without key are skipped.
+    duplicates - 'first', 'last' or 'list' (a key is mapped to the list of objects)"""
+    DUPLICATES = ("first", "last", "list")
+
+    def __init__(self, query, pytype=str, key=".", duplicates="first", strict=False, cache=True):
+        if duplicates not in self.DUPLICATES:
+            raise ValueError("duplicates should be one of {}, got '{}'".format(self.DUPLICATES, duplicates))
+        super().__init__(query, pytype=pytype, default={}, strict=strict, cache=cache)
+        self._key = key
+        self._duplicates = duplicates
+
+    def __get__(self, instance, owner):
+        if not instance:
+            return self
+        return self.cached(instance, self.mapping)
+
+    def index(self, doc, doc_namespaces=None):
+        """:return dict of keys to found nodes (or lists of nodes)"""
+        nodes = self.exec_query(doc, doc_namespaces)
+        if not nodes:
+            return {}
+        find_key = compile_query(self._key, self.resolve_namespaces(doc, doc_namespaces), False)
+        index = {}
+        for node in nodes:
+            key = find_key(node)
+            if type(key) is list:
+                if not key:
+                    continue
+                key = key[0]
+            if type(key) is not str:
+                key = getattr(key, 'text', key)
+            if self._duplicates == "first":
+                index.setdefault(key, node)
+            elif self._duplicates == "last":
+                index[key] = node
+            else:
+                index.setdefault(key, []).append(node)
+        return index
+
+    def mapping(self, doc, doc_namespaces=None):
+        """:return LazyMapping, objects are created on demand"""
+        convert = self._convert_objects if self._duplicates == "list" else self._convert_object
+        return LazyMapping(self.index(doc, doc_namespaces), convert)
+
+    def extract(self, doc, doc_namespaces=None):
+        extract = self._extract_objects if self._duplicates == "list" else self._extract_object
+        return {key: extract(item) for key, item in self.index(doc, doc_namespaces).items()}
+
+    def _convert_objects(self, nodes):
+        return [self._convert_object(node) for node in nodes]
+
+    def _extract_objects(self, nodes):
+        return [self._extract_object(node) for node in nodes]
+
+
 class DateTimeField(XmlField):
-    def __init__(self, *args, dayfirst=False, yearfirst=False, fuzzy=True, **kwargs):
+    _smart_strings = False
+
+    def __init__(self, *args, dayfirst=False, yearfirst=False, fuzzy=True, formats=None, cache_size=None, **kwargs):
         super().__init__(*args, **kwargs)
         self._parserinfo = date_parser.parserinfo(dayfirst=dayfirst, yearfirst=yearfirst)
         self._fuzzy = fuzzy
+        self._formats = tuple(formats or ())
+        # dayfirst changes the meaning of ISO-like dates for dateutil, so they can't be parsed as ISO
+        self._isoformat = not dayfirst
+        if cache_size:
+            self._parse_date = lru_cache(maxsize=cache_size)(self._parse_date)
 
     def __get__(self, instance, owner):
         if not instance:
             return self
-        self._owner_name = instance.__class__.__name__
-        return self.convert_date(self.value(instance.document), self._default)
+        return self.cached(instance, self.extract)
+
+    def extract(self, doc, doc_namespaces=None):
+        return self.convert_date(self.value(doc, doc_namespaces), self._default)
+
+    def _timed_parse_date(self, date):
+        start = perf_counter()
+        try:
+            return self._parse_date(date)
+        finally:
+            stats.record_conversion(self.stats_name, perf_counter() - start)
+
+    def _parse_date(self, date):
+        if isinstance(date, str):
+            for date_format in self._formats:
+                try:
+                    return datetime.strptime(date, date_format)
+                except ValueError:
+                    pass
+            if self._isoformat:
+                try:
+                    return datetime.fromisoformat(date)
+                except ValueError:
+                    pass
+        return date_parser.parse(date, fuzzy=self._fuzzy, parserinfo=self._parserinfo)
 
     def convert_date(self, date, default):
+        if isinstance(date, datetime):
+            return date
         try:
-            return date_parser.parse(date, fuzzy=self._fuzzy, parserinfo=self._parserinfo)
+            return self._timed_parse_date(date) if stats.enabled else self._parse_date(date)
         except (ValueError, OverflowError) as err:
             logger.warning("{{ '{}':: Attr: '{}', Query: '{}' }} Exception: {}"
                            .format(self._owner_name, self._attr_name, self._query, err))
@@ -115,3 +332,26 @@ class DateTimeField(XmlField):
         else:
             raise ValueError("Can't convert value {} to date. {{ '{}':: Attr: '{}', Query: '{}' }}"
                              .format(date, self._owner_name, self._attr_name, self._query))
+
+
+class ListDateTimeField(DateTimeField):
+    _smart_strings = True
+
+    def __get__(self, instance, owner):
+        if not instance:
+            return self
+        return self.cached(instance, self.dates_list)
+
+    def dates_list(self, doc, doc_namespaces=None):
+        """:return Selector
+        Converts all found values at once, every distinct value is parsed only once"""
+        dates = {}
+        result = []
+        for value in self.values_list(doc, doc_namespaces):
+            if value not in dates:
+                dates[value] = self.convert_date(value, self._default)
+            result.append(dates[value])
+        return Selector(result, self._default)
+
+    def extract(self, doc, doc_namespaces=None):
+        return self.dates_list(doc, doc_namespaces).all()
@@ -0,0 +1,47 @@
+import threading
+
+from lxml import etree
+
+_parsers = threading.local()
+
+
+def get_parser(options):
+    """:return etree.XMLParser
+    Parser with the options, parsers are created once per thread and reused
+    since a parser can't be used by several threads at the same time"""
+    try:
+        cache = _parsers.cache
+    except AttributeError:
+        cache = _parsers.cache = {}
+    key = tuple(sorted(options.items()))
+    parser = cache.get(key)
+    if parser is None:
+        parser = cache[key] = etree.XMLParser(**options)
+    return parser
+
+
+_namespaced_attributes = etree.XPath('descendant-or-self::*[@*[namespace-uri() != ""]]')
+_has_namespaces = etree.XPath('boolean(descendant-or-self::*[namespace-uri() != "" or @*[namespace-uri() != ""]])')
+
+
+def strip_attributes(element):
+    attrib = element.attrib
+    for name in [name for name in attrib if name[0] == '{']:
+        attrib[name.rpartition('}')[2]] = attrib.pop(name)
+
+
+def strip_namespaces(root):
+    """:return root
+    Replaces tags and attribute names of the element and its descendants with local names in place.
+    Every element is visited, only namespaced tags and attributes are renamed.
+    Namespace declarations are kept, they don't affect queries without prefixes"""
+    for element in root.iter('{*}*'):
+        element.tag = element.tag.rpartition('}')[2]
+    for element in _namespaced_attributes(root):
+        strip_attributes(element)
+    return root
+
+
+def is_namespaced(element):
+    """:return bool - tags or attribute names of the element or its descendants have namespaces"""
+    return _has_namespaces(element)
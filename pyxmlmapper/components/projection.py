@@ -0,0 +1,257 @@
+"""Projection of a model: element paths which the field queries of the model can reach.
+
+Only simple relative paths are analyzed: element names (with or without prefix) separated by '/', '.' steps,
+and '@attribute' or 'text()' as the last step. Models with other queries (//, predicates, functions, axes, ...)
+have no projection and their documents are parsed completely.
+
+If the model has only single value fields (ValueField, DateTimeField, ObjectField), the document is fed to
+the parser by chunks and parsing stops as soon as the query of every field finds a complete node
+(an attribute or an element followed by other nodes) in the part of the document parsed so far,
+so the result of the query is the same as for the whole document. The queries are checked when the parsed part
+doubles, so the checks cost no more than two evaluations of the queries on the whole document.
+Elements which no query can reach are removed from the parsed part then (they are only cleared if text()
+of their parent is read, so the text nodes are kept). Documents of models with list fields are parsed completely
+(see BaseXmlParser._source_parser): their elements have to be read anyway and libxml2 builds the whole tree
+faster than python can prune it.
+"""
+import re
+from itertools import chain
+
+from lxml import etree
+
+from .fields import (DateTimeField, ListDateTimeField, ListObjectField, ListValueField, ObjectField, ValueField,
+                     compile_query)
+from .parsers import strip_namespaces
+
+_STEP = re.compile(r"^(?:[A-Za-z_][\w.-]*:)?(?P<local>[A-Za-z_][\w.-]*)$")
+
+# bytes read from the source and fed to the parser at once, libxml2 parses larger chunks slower
+CHUNK_SIZE = 1 << 14
+# the fields are checked when this number of bytes is parsed, then every time the parsed part grows CHECK_GROWTH times
+FIRST_CHECK = 1 << 8
+CHECK_GROWTH = 4
+
+SINGLE_VALUE_FIELDS = (ValueField, DateTimeField, ObjectField)
+MULTIPLE_VALUES_FIELDS = (ListValueField, ListDateTimeField, ListObjectField)
+OBJECT_FIELDS = (ObjectField, ListObjectField)
+
+
+def parse_steps(query):
+    """:return (list of element steps as they are written - 'prefix:name' or 'name', last step kind)
+    or None if the query can't be analyzed, last step kind is 'attribute', 'text' or None"""
+    if not query or query.startswith("/") or "//" in query:
+        return None
+    steps = [step.strip() for step in query.split("/")]
+    last = None
+    if steps[-1] == "text()":
+        last = "text"
+        steps.pop()
+    elif steps[-1].startswith("@"):
+        if not _STEP.match(steps[-1][1:]):
+            return None
+        last = "attribute"
+        steps.pop()
+    names = []
+    for step in steps:
+        if step == ".":
+            continue
+        if not _STEP.match(step):
+            return None
+        names.append(step)
+    return names, last
+
+
+def parse_path(query):
+    """:return (list of local names of element steps, last step kind) or None if the query can't be analyzed
+    last step kind is 'attribute', 'text' or None"""
+    path = parse_steps(query)
+    if path is None:
+        return None
+    names, last = path
+    return [name.rpartition(":")[2] for name in names], last
+
+
+class Node:
+    def __init__(self):
+        self.children = {}
+        # all the descendants of the element are kept
+        self.whole = False
+        # text() of the element is read, tails of the removed children have to be kept
+        self.tails = False
+
+    def child(self, name):
+        node = self.children.get(name)
+        if node is None:
+            node = self.children[name] = Node()
+        return node
+
+
+class Projection:
+    def __init__(self):
+        self.root = Node()
+        # single value fields of the model, parsing stops when all of them are resolved
+        self.fields = []
+        self.terminates = True
+        # documents of the model are stripped of namespaces, see __namespaces__ = {"strip": True}
+        self.strip = False
+
+    @classmethod
+    def from_model(cls, model):
+        """:return Projection or None if some query of the model can't be analyzed"""
+        projection = cls()
+        projection.strip = bool(model.__namespaces__.get('strip'))
+        return projection if projection.add_model(projection.root, model, top=True) else None
+
+    def add_model(self, node, model, top=False):
+        plan = getattr(model, 'extraction_plan', None)
+        if plan is None:
+            return False
+        return all(self.add_field(node, field, top) for _, field in plan())
+
+    def add_field(self, node, field, top):
+        """:return bool - False if the field can't be analyzed"""
+        kind = type(field)
+        if kind not in SINGLE_VALUE_FIELDS and kind not in MULTIPLE_VALUES_FIELDS:
+            return False
+        path = parse_path(field._query)
+        if path is None:
+            return False
+        names, last = path
+        for name in names:
+            node = node.child(name)
+        if kind in OBJECT_FIELDS and last is None:
+            if hasattr(field._pytype, 'extraction_plan'):
+                if not self.add_model(node, field._pytype):
+                    return False
+            else:
+                node.whole = True
+        if last == "text":
+            node.tails = True
+        if top:
+            if kind in SINGLE_VALUE_FIELDS:
+                self.fields.append(field)
+            else:
+                self.terminates = False
+        return True
+
+
+def _followed(element):
+    """:return bool - the parser has read past the end of the element"""
+    while element is not None:
+        if element.getnext() is not None:
+            return True
+        element = element.getparent()
+    return False
+
+
+def _complete(node):
+    """:return bool - the found node and everything a field reads from it are parsed"""
+    if isinstance(node, str):
+        if node.is_attribute:
+            return True
+        node = node.getparent()  # element of the text or the tail
+    return _followed(node)
+
+
+class _Resolver:
+    def __init__(self, projection, root):
+        self.root = root
+        self.pending = list(projection.fields)
+
+    def resolved(self):
+        """:return bool - queries of all the fields find complete nodes in the parsed part of the document"""
+        pending = []
+        for field in self.pending:
+            try:
+                found = compile_query(field._query, field.resolve_namespaces(self.root))(self.root)
+            except etree.XPathError:
+                continue  # the error is raised when the field is evaluated
+            if not (type(found) is list and found and _complete(found[0])):
+                pending.append(field)
+        self.pending = pending
+        return not pending
+
+
+def _drop(parent, child):
+    # a removed element is moved to a new document with its descendants, an emptied one is moved at once
+    child.clear()
+    parent.remove(child)
+
+
+def _prune(element, node):
+    """Removes the descendants of the element which no query can reach
+    (only clears them if text() of their parent is read, so their tails are kept)"""
+    if node.whole:
+        return
+    for child in list(element):
+        tag = child.tag
+        child_node = node.children.get(tag.rpartition("}")[2]) if type(tag) is str else None
+        if child_node is not None:
+            _prune(child, child_node)
+        elif node.tails:
+            child.clear(keep_tail=True)
+        else:
+            _drop(element, child)
+
+
+def _read_chunks(source):
+    if isinstance(source, str):
+        with open(source, "rb") as fh:
+            yield from iter(lambda: fh.read(CHUNK_SIZE), b"")
+    else:
+        yield from iter(lambda: source.read(CHUNK_SIZE), b"")
+
+
+def _root_tag(chunks, parser_options):
+    """:return (tag of the root element or None, chunks read to find it)"""
+    probe = etree.XMLPullParser(events=("start",), **parser_options)
+    read = []
+    for chunk in chunks:
+        read.append(chunk)
+        # the root usually starts in the first bytes, the rest of the chunk is not parsed twice
+        for start in range(0, len(chunk), FIRST_CHECK):
+            probe.feed(chunk[start:start + FIRST_CHECK])
+            for _, element in probe.read_events():
+                return element.tag, read
+    return None, read
+
+
+def parse_projected(source, parser_options, projection):
+    """:return root element
+    Parses the source (file name or file object) until the fields of the projection are resolved"""
+    chunks = _read_chunks(source)
+    root_tag, head = _root_tag(chunks, parser_options)
+    if root_tag is None:
+        parser = etree.XMLParser(**parser_options)
+        for chunk in chain(head, chunks):
+            parser.feed(chunk)
+        return parser.close()
+    # the only reported element is the root
+    parser = etree.XMLPullParser(events=("start",), tag=root_tag, **parser_options)
+    root = resolver = None
+    parsed = 0
+    next_check = FIRST_CHECK
+    for chunk in chain(head, chunks):
+        start = 0
+        while start < len(chunk):
+            end = start + next_check - parsed
+            piece = chunk[start:end] if start or end < len(chunk) else chunk
+            parser.feed(piece)
+            parsed += len(piece)
+            start += len(piece)
+            for _, element in parser.read_events():
+                if root is None:
+                    root = element
+            if parsed < next_check:
+                continue
+            next_check = parsed * CHECK_GROWTH
+            if root is None:
+                continue
+            if projection.strip:
+                strip_namespaces(root)  # only the new elements are renamed
+            if resolver is None:
+                resolver = _Resolver(projection, root)
+            if resolver.resolved():
+                _prune(root, projection.root)
+                return root
+    return parser.close()
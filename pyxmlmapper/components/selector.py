@@ -1,5 +1,5 @@
 from .common import Default
-from collections.abc import Iterable, Sized
+from collections.abc import Iterable, Mapping, Sized
 
 
 class Selector(Iterable, Sized):
@@ -34,3 +34,72 @@ class Selector(Iterable, Sized):
     def __iter__(self):
         for item in self._items:
             yield item
+
+
+class LazySelector(Selector):
+    """Selector of raw items (e.g. found nodes) which are converted on demand,
+    every item is converted only once. Slices and all() return lists of converted items"""
+    _missing = object()
+
+    def __init__(self, items, convert, default=""):
+        super().__init__(items, default)
+        self._convert = convert
+        self._converted = [self._missing] * len(items)
+
+    def _get(self, index):
+        value = self._converted[index]
+        if value is self._missing:
+            value = self._converted[index] = self._convert(self._items[index])
+        return value
+
+    def first(self):
+        if not len(self._items):
+            return Default(self._default)
+        return self._get(0)
+
+    def last(self):
+        if not len(self._items):
+            return Default(self._default)
+        return self._get(-1)
+
+    def item(self, index):
+        if len(self._items) < abs(index):
+            return Default(self._default)
+        return self._get(index)
+
+    def all(self):
+        return [self._get(index) for index in range(len(self._items))]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._get(index) for index in range(*item.indices(len(self._items)))]
+        return self._get(item)
+
+    def __iter__(self):
+        for index in range(len(self._items)):
+            yield self._get(index)
+
+
+class LazyMapping(Mapping):
+    """Read-only mapping of keys to raw items (e.g. found nodes) which are converted on demand,
+    every item is converted only once"""
+    def __init__(self, items, convert):
+        self._items = items
+        self._convert = convert
+        self._converted = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._converted[key]
+        except KeyError:
+            value = self._converted[key] = self._convert(self._items[key])
+            return value
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
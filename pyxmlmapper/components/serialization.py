@@ -0,0 +1,197 @@
+"""Streaming JSON serialization of models, see BaseXmlParser.dump_json and BaseXmlParser.iter_ndjson.
+
+The fields of a model are walked the same way as by extract(), but the JSON text is produced piece by piece:
+elements of list fields are converted and written one by one, nothing holds the whole result.
+Simple element paths (e.g. 'Items/Item') are walked with iterchildren, so even the found elements are not
+collected into a list. Output is the same as json.dumps of Model.extract() with compact separators,
+datetime, date and time values are written in ISO 8601 format, Decimal values as strings.
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from . import stats
+from .fields import (DateTimeField, ListDateTimeField, ListObjectField, ListValueField, MapField, ObjectField,
+                     ValueField, document_namespaces)
+from .projection import parse_steps
+from .streaming import qualify_tag
+
+# pieces are joined into chunks of at least this length before they are written
+CHUNK_SIZE = 1 << 16
+
+
+class JSONEncoder(json.JSONEncoder):
+    def __init__(self, **kwargs):
+        if kwargs.get("separators") is None and kwargs.get("indent") is None:
+            kwargs["separators"] = (",", ":")
+        super().__init__(**kwargs)
+
+    def default(self, value):
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return super().default(value)
+
+
+def is_model(pytype):
+    return hasattr(pytype, 'extraction_plan')
+
+
+def build_selection(model, names):
+    """:return dict of attribute name to selection of the nested model (None - all the fields) or None
+    names - iterable of attribute names, fields of nested models are selected with dotted names ('items.price')"""
+    if names is None:
+        return None
+    nested = {}
+    for name in names:
+        head, _, rest = name.partition(".")
+        if not rest:
+            nested[head] = None
+        elif nested.get(head, ()) is not None:
+            nested.setdefault(head, []).append(rest)
+    plan = dict(model.extraction_plan())
+    selection = {}
+    for name, rest in nested.items():
+        field = plan.get(name)
+        if field is None:
+            raise ValueError("{} has no field '{}'".format(model.__name__, name))
+        if rest is not None and not (isinstance(field, (ObjectField, ListObjectField, MapField))
+                                     and is_model(field._pytype)):
+            raise ValueError("Field '{}' of {} has no nested fields".format(name, model.__name__))
+        selection[name] = None if rest is None else build_selection(field._pytype, rest)
+    return selection
+
+
+def _walk(element, tags):
+    if not tags:
+        yield element
+        return
+    for child in element.iterchildren(tags[0]):
+        yield from _walk(child, tags[1:])
+
+
+def iter_nodes(field, doc, doc_namespaces=None):
+    """:return iterable of the nodes found by the query of the field
+    Simple element paths are walked without collecting the found elements into a list"""
+    if doc is None:
+        return []
+    path = parse_steps(field._query)
+    if path is None or path[1] is not None or field._strict or stats.enabled:
+        return field.exec_query(doc, doc_namespaces)
+    namespaces = field.resolve_namespaces(doc, doc_namespaces)
+    tags = [qualify_tag(name, namespaces) for name in path[0]]
+    if None in tags:
+        return field.exec_query(doc, doc_namespaces)  # unknown prefix, XPath raises the error
+    return _walk(doc, tags)
+
+
+def _is_flat(model):
+    return all(type(field) in (ValueField, DateTimeField) for _, field in model.extraction_plan())
+
+
+def _iter_object(field, element, selection, encode, flat):
+    if not is_model(field._pytype):
+        yield encode(field._extract_object(element))
+    elif flat:
+        # a small dict of scalar values is encoded at once
+        yield encode(field._pytype.extract(element))
+    else:
+        yield from iter_model(field._pytype, element, selection, encode)
+
+
+def _iter_items(items, iter_item):
+    yield "["
+    separator = ""
+    for item in items:
+        yield separator
+        yield from iter_item(item)
+        separator = ","
+    yield "]"
+
+
+def iter_field(field, doc, doc_namespaces, selection, encode):
+    """:return generator of JSON text pieces of the field value"""
+    kind = type(field)
+    flat = selection is None and is_model(field._pytype) and _is_flat(field._pytype)
+    if kind is ListObjectField:
+        nodes = iter_nodes(field, doc, doc_namespaces)
+        yield from _iter_items(nodes, lambda node: _iter_object(field, node, selection, encode, flat))
+    elif kind is ListValueField:
+        nodes = iter_nodes(field, doc, doc_namespaces)
+        yield from _iter_items(nodes, lambda node: (encode(field._convert_value(node)),))
+    elif kind is ListDateTimeField:
+        yield from _iter_items(field.dates_list(doc, doc_namespaces), lambda value: (encode(value),))
+    elif kind is ObjectField:
+        found = field.exec_query(doc, doc_namespaces)
+        if type(found) is list and found:
+            yield from _iter_object(field, found[0], selection, encode, flat)
+        else:
+            yield encode(field.object_dict(doc, doc_namespaces))
+    elif kind is MapField:
+        yield "{"
+        separator = ""
+        for key, item in field.index(doc, doc_namespaces).items():
+            yield "{}{}:".format(separator, encode(key if type(key) is str else str(key)))
+            if field._duplicates == "list":
+                yield from _iter_items(item, lambda node: _iter_object(field, node, selection, encode, flat))
+            else:
+                yield from _iter_object(field, item, selection, encode, flat)
+            separator = ","
+        yield "}"
+    else:
+        yield encode(field.extract(doc, doc_namespaces))
+
+
+def iter_model(model, doc, selection, encode):
+    """:return generator of JSON text pieces of the model fields for the document
+    selection - see build_selection, encode - function which returns JSON text of a plain value"""
+    if doc is not None:
+        doc = model.parse(doc)
+    doc_namespaces = None
+    if doc is not None and model.__namespaces__.get('auto'):
+        doc_namespaces = document_namespaces(doc)
+    separator = "{"
+    for name, field in model.extraction_plan():
+        if selection is not None and name not in selection:
+            continue
+        yield "{}{}:".format(separator, encode(name))
+        yield from iter_field(field, doc, doc_namespaces, selection and selection[name], encode)
+        separator = ","
+    yield "{}" if separator == "{" else "}"
+
+
+def join_chunks(pieces, size=None):
+    """:return generator of str
+    Joins small pieces of text into chunks of at least size characters (CHUNK_SIZE by default)"""
+    size = size or CHUNK_SIZE
+    chunk = []
+    length = 0
+    for piece in pieces:
+        chunk.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(chunk)
+            chunk = []
+            length = 0
+    if chunk:
+        yield "".join(chunk)
+
+
+def iter_json(model, doc, fields=None, encoder=None):
+    """:return generator of chunks of JSON text of the model fields for the document"""
+    encode = (encoder or JSONEncoder()).encode
+    return join_chunks(iter_model(model, doc, build_selection(model, fields), encode))
+
+
+def iter_ndjson(model, docs, fields=None, encoder=None):
+    """:return generator of chunks of NDJSON text, every document is written as one line"""
+    encode = (encoder or JSONEncoder()).encode
+    selection = build_selection(model, fields)
+
+    def pieces():
+        for doc in docs:
+            yield from iter_model(model, doc, selection, encode)
+            yield "\n"
+
+    return join_chunks(pieces())
@@ -0,0 +1,90 @@
+import bz2
+import gzip
+import lzma
+import os
+
+from lxml import etree
+
+# magic bytes of compressed data and constructors of file objects which decompress it
+_COMPRESSIONS = (
+    (b"\x1f\x8b", lambda fileobj: gzip.GzipFile(fileobj=fileobj, mode="rb")),
+    (b"BZh", bz2.BZ2File),
+    (b"\xfd7zXZ\x00", lzma.LZMAFile),
+)
+
+
+def _decompressor(header):
+    for magic, file_class in _COMPRESSIONS:
+        if header.startswith(magic):
+            return file_class
+    return None
+
+
+class BufferReader:
+    """File-like reader of bytes-like object (memoryview, mmap, ...) which returns it by chunks,
+    the buffer is not copied as a whole"""
+    def __init__(self, buffer):
+        self._buffer = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def read(self, size=-1):
+        end = len(self._buffer) if size is None or size < 0 else self._position + size
+        chunk = self._buffer[self._position:end].tobytes()
+        self._position += len(chunk)
+        return chunk
+
+
+def parse_tree(source, parser):
+    """:return root element of file name or file object"""
+    return etree.parse(source, parser).getroot()
+
+
+def parse_file(path, parser, parse=parse_tree):
+    """:return element
+    Compressed files (gzip, bz2, xz) are decompressed while parsing, other files are read by libxml2.
+    parse(file name or file object, parser) - function which parses the data"""
+    path = os.fspath(path)
+    with open(path, "rb") as fh:
+        file_class = _decompressor(fh.read(6))
+        if file_class is None:
+            return parse(path, parser)
+        fh.seek(0)
+        with file_class(fh) as stream:
+            return parse(stream, parser)
+
+
+def parse_bytes(buffer, parser, parse=parse_tree):
+    """:return element
+    buffer - bytes, bytearray, memoryview, mmap or other object with buffer protocol, possibly compressed"""
+    file_class = _decompressor(bytes(memoryview(buffer)[:6]))
+    if file_class is not None:
+        with file_class(BufferReader(buffer)) as stream:
+            return parse(stream, parser)
+    if parse is not parse_tree:
+        return parse(BufferReader(buffer), parser)
+    if isinstance(buffer, bytes):
+        return etree.fromstring(buffer, parser)
+    try:
+        return etree.fromstring(buffer, parser)
+    except (TypeError, ValueError):
+        # older lxml accepts only bytes and str
+        return parse_tree(BufferReader(buffer), parser)
+
+
+def parse_stream(stream, parser, parse=parse_tree):
+    """:return element
+    stream - binary file object, compressed data is decompressed while parsing if the stream is seekable
+    or supports peek()"""
+    if hasattr(stream, "peek"):
+        header = stream.peek(6)[:6]
+    elif hasattr(stream, "seekable") and stream.seekable():
+        position = stream.tell()
+        header = stream.read(6)
+        stream.seek(position)
+    else:
+        header = b""
+    file_class = _decompressor(header)
+    if file_class is None:
+        return parse(stream, parser)
+    with file_class(stream) as decompressed:
+        return parse(decompressed, parser)
@@ -0,0 +1,101 @@
+"""Opt-in statistics of field evaluations.
+
+    from pyxmlmapper import stats
+
+    stats.enable()
+    ...
+    stats.snapshot()  # {'PurchaseOrder.items': {'count': 10, 'query_time': 0.001, ...}}
+
+Nothing is recorded while statistics are disabled, the fields only check `stats.enabled`.
+"""
+import threading
+
+enabled = False
+
+_lock = threading.Lock()
+_stats = {}
+_callbacks = []
+
+
+class FieldStats:
+    __slots__ = ('count', 'query_time', 'max_query_time', 'convert_time',
+                 'results', 'max_results', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def snapshot():
+    """:return dict
+    Copy of statistics by 'Model.field' names"""
+    with _lock:
+        return {name: item.as_dict() for name, item in _stats.items()}
+
+
+def add_callback(callback):
+    """callback(name, metric, value) is called for every recorded value, metric is one of
+    'query_time', 'results', 'convert_time', 'cache_hit', 'cache_miss'"""
+    _callbacks.append(callback)
+
+
+def remove_callback(callback):
+    _callbacks.remove(callback)
+
+
+def _get(name):
+    item = _stats.get(name)
+    if item is None:
+        item = _stats[name] = FieldStats()
+    return item
+
+
+def _notify(name, *metrics):
+    for callback in _callbacks:
+        for metric, value in metrics:
+            callback(name, metric, value)
+
+
+def record_query(name, seconds, results):
+    with _lock:
+        item = _get(name)
+        item.count += 1
+        item.query_time += seconds
+        item.max_query_time = max(item.max_query_time, seconds)
+        item.results += results
+        item.max_results = max(item.max_results, results)
+    _notify(name, ('query_time', seconds), ('results', results))
+
+
+def record_conversion(name, seconds):
+    with _lock:
+        _get(name).convert_time += seconds
+    _notify(name, ('convert_time', seconds))
+
+
+def record_cache(name, hit):
+    with _lock:
+        item = _get(name)
+        if hit:
+            item.cache_hits += 1
+        else:
+            item.cache_misses += 1
+    _notify(name, ('cache_hit' if hit else 'cache_miss', 1))
@@ -0,0 +1,131 @@
+import asyncio
+import os
+from io import BytesIO
+
+from lxml import etree
+
+
+def qualify_tag(tag, namespaces):
+    """:return str or None
+    Converts 'prefix:tag' to '{namespace}tag' using namespaces map,
+    returns None if the prefix is unknown"""
+    if tag is None or tag.startswith('{') or ':' not in tag:
+        return tag
+    prefix, local_name = tag.split(':', 1)
+    namespace = namespaces.get(prefix)
+    return None if namespace is None else "{{{}}}{}".format(namespace, local_name)
+
+
+class ElementFilter:
+    """Selects elements with the tag from parser events.
+    If the tag can't be qualified with namespaces, its prefix is resolved with the document namespaces
+    (start-ns events)"""
+    def __init__(self, tag, namespaces):
+        self.tag = tag
+        self.qualified_tag = qualify_tag(tag, {} if namespaces.get('auto') else namespaces)
+        self.auto = self.qualified_tag is None
+        self.events = ('start-ns', 'end') if self.auto else ('end',)
+        self.document_namespaces = {}
+        if namespaces.get('strip'):
+            # elements of any namespace with the local name of a Clark or prefixed tag
+            self.qualified_tag = '{*}' + tag.rpartition('}')[2].rpartition(':')[2]
+
+    def parser_kwargs(self):
+        """:return dict of events and tag for iterparse or XMLPullParser"""
+        if self.auto:
+            return {"events": self.events}
+        return {"events": self.events, "tag": self.qualified_tag}
+
+    def __call__(self, events):
+        """:return generator of elements"""
+        if not self.auto:
+            for _, element in events:
+                yield element
+            return
+        for event, item in events:
+            if event == 'start-ns':
+                prefix, namespace = item
+                self.document_namespaces[prefix or 'ns'] = namespace
+                self.qualified_tag = qualify_tag(self.tag, self.document_namespaces)
+            elif item.tag == self.qualified_tag:
+                yield item
+
+
+def release_preceding(element):
+    """Removes processed siblings which precede the element,
+    comments and processing instructions before the root element are kept"""
+    parent = element.getparent()
+    while parent is not None and element.getprevious() is not None:
+        del parent[0]
+
+
+def iter_elements(source, tag, namespaces, parser_options=None):
+    """:return generator of elements
+    Parses source incrementally and yields elements with the tag one by one.
+    An element is cleared when the next one is requested and removed with its preceding siblings
+    before the next one is yielded,
+    so memory usage depends on the size of a record and not on the size of a document.
+    source - XML text (str), bytes-like object, file path (os.PathLike) or binary file object.
+    parser_options - options of etree.XMLParser, recover by default"""
+    parser_options = {"recover": True} if parser_options is None else parser_options
+    if isinstance(source, str):
+        # XML text, the encoding declaration doesn't apply to the encoded text
+        source = BytesIO(source.encode('utf8'))
+        parser_options = dict(parser_options, encoding='utf8')
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = BytesIO(source)
+    elif isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    element_filter = ElementFilter(tag, namespaces)
+    context = etree.iterparse(source, **element_filter.parser_kwargs(), **parser_options)
+    for element in element_filter(context):
+        release_preceding(element)
+        yield element
+        element.clear(keep_tail=True)
+
+
+async def _aiter_chunks(chunks):
+    if hasattr(chunks, '__aiter__'):
+        async for chunk in chunks:
+            yield chunk
+    else:
+        for chunk in chunks:
+            yield chunk
+
+
+async def afeed_chunks(chunks, parser, executor=None):
+    """:return async generator of None after every fed chunk and of the result of parser.close() at the end
+    Chunks are fed in the executor (default executor of the loop if None), so the event loop is not blocked
+    while libxml2 parses a chunk"""
+    loop = asyncio.get_running_loop()
+    async for chunk in _aiter_chunks(chunks):
+        if chunk:
+            await loop.run_in_executor(executor, parser.feed, chunk)
+            yield None
+    yield await loop.run_in_executor(executor, parser.close)
+
+
+async def aparse_chunks(chunks, parser_options=None, executor=None):
+    """:return root element
+    chunks - async iterable (or iterable) of bytes. A new parser is created for every document
+    because chunks are fed in the executor threads"""
+    parser_options = {"recover": True} if parser_options is None else parser_options
+    parser = etree.XMLParser(**parser_options)
+    root = None
+    async for root in afeed_chunks(chunks, parser, executor):
+        pass
+    return root
+
+
+async def aiter_elements(chunks, tag, namespaces, parser_options=None, executor=None):
+    """:return async generator of elements
+    Async version of iter_elements, chunks - async iterable (or iterable) of bytes.
+    An element is yielded as soon as the chunk with its end tag is parsed"""
+    parser_options = {"recover": True} if parser_options is None else parser_options
+    element_filter = ElementFilter(tag, namespaces)
+    parser = etree.XMLPullParser(**element_filter.parser_kwargs(), **parser_options)
+    async for _ in afeed_chunks(chunks, parser, executor):
+        for element in element_filter(parser.read_events()):
+            release_preceding(element)
+            yield element
+            element.clear(keep_tail=True)
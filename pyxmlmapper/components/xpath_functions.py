@@ -1,3 +1,6 @@
+import re
+from functools import lru_cache
+
 from lxml import etree
 
 ns = etree.FunctionNamespace(None)
@@ -24,4 +27,163 @@ def match(context, tag, *search):
     """:return bool
     search exact match for tag from several variants
     """
-    return any(pattern == tag for pattern in search)
\ No newline at end of file
+    return any(pattern == tag for pattern in search)
+
+
+@lru_cache(maxsize=None)
+def _uppercase_letters():
+    """:return dict of lowercase letter to the letters of the BMP which str.lower() turns into it
+    The table is built on the first rewritten call of lower()"""
+    letters = {}
+    for code in range(0x10000):
+        lower = chr(code).lower()
+        if len(lower) == 1 and lower != chr(code):
+            letters.setdefault(lower, []).append(chr(code))
+    return letters
+
+
+# Queries are rewritten to native XPath 1.0 while the functions above are registered:
+# tag() -> local-name(), match(x, 'a', 'b') -> (x = 'a' or x = 'b') if x is a call of a string function,
+# lower(x) = 'literal' -> translate(x, ...) = 'literal' if the literal is lowercase.
+# translate() maps only the letters which str.lower() turns into the letters of the literals
+# (libxml2 scans the whole table for every character), other calls of lower() are kept.
+# final sigma depends on the next letters, U+0307 comes from 'İ' with 'i', the lower letters of other planes
+# come from letters of their planes which aren't in the table
+_CONTEXT_LETTERS = re.compile("[\u03c3\u03c2\u0307\U00010000-\U0010ffff]")
+# the callback of match() compares node-sets and numbers with the literals as python objects, they never match
+_STRING_FUNCTIONS = frozenset(("tag", "lower", "local-name", "name", "namespace-uri", "string", "concat", "substring",
+                               "substring-before", "substring-after", "normalize-space", "translate"))
+_NAME_CHARS = "-_.:"
+_COMPARED_AFTER = re.compile(r"\s*!?=\s*('[^']*'|\"[^\"]*\")")
+_COMPARED_BEFORE = re.compile(r"('[^']*'|\"[^\"]*\")\s*!?=\s*$")
+
+
+def _is_literal(arg):
+    return len(arg) > 1 and arg[0] in "'\"" and arg[-1] == arg[0] and arg[0] not in arg[1:-1]
+
+
+def _rewrite_tag(args, literals):
+    return "local-name()" if not args else None
+
+
+def _rewrite_match(args, literals):
+    if len(args) < 2:
+        return None
+    tag_name, patterns = args[0], args[1:]
+    call = _parse_call(tag_name)
+    if call is None or call[0] not in _STRING_FUNCTIONS or not all(map(_is_literal, patterns)):
+        return None
+    if call[0] == "lower" and _registered("lower") is lower and all(map(_is_literal, patterns)):
+        tag_name = _rewrite_lower(call[1], patterns) or rewrite(tag_name)
+    else:
+        tag_name = rewrite(tag_name)
+    return "({})".format(" or ".join("({}) = {}".format(tag_name, pattern) for pattern in patterns))
+
+
+def _rewrite_lower(args, literals):
+    if len(args) != 1 or not literals:
+        return None
+    text = "".join(literal[1:-1] for literal in literals)
+    if text != text.lower() or _CONTEXT_LETTERS.search(text):
+        return None
+    upper = "".join(sorted(letter for lower in set(text) for letter in _uppercase_letters().get(lower, ())))
+    return "translate({}, '{}', '{}')".format(rewrite(args[0]), upper, "".join(map(str.lower, upper)))
+
+
+_REWRITES = {"tag": (tag, _rewrite_tag), "match": (match, _rewrite_match), "lower": (lower, _rewrite_lower)}
+
+
+def _registered(name):
+    try:
+        return ns[name]
+    except KeyError:
+        return None
+
+
+def _skip_literal(query, position):
+    """:return position after the string literal which starts at the position"""
+    end = query.find(query[position], position + 1)
+    return len(query) if end < 0 else end + 1
+
+
+def _split_args(query, start):
+    """:return (list of arguments, position after the closing parenthesis) or None
+    start - position after the opening parenthesis"""
+    args, depth, position, arg_start = [], 0, start, start
+    while position < len(query):
+        char = query[position]
+        if char in "'\"":
+            position = _skip_literal(query, position)
+            continue
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            if depth == 0:
+                if query[arg_start:position].strip() or args:
+                    args.append(query[arg_start:position].strip())
+                return args, position + 1
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append(query[arg_start:position].strip())
+            arg_start = position + 1
+        position += 1
+    return None
+
+
+def _name_end(query, position):
+    while position < len(query) and (query[position].isalnum() or query[position] in _NAME_CHARS):
+        position += 1
+    return position
+
+
+def _call_at(query, position):
+    """:return (name, arguments, end position) of the function call which starts at the position or None"""
+    end = _name_end(query, position)
+    paren = end
+    while paren < len(query) and query[paren].isspace():
+        paren += 1
+    if paren == len(query) or query[paren] != "(":
+        return None
+    split = _split_args(query, paren + 1)
+    return None if split is None else (query[position:end], split[0], split[1])
+
+
+def _parse_call(expression):
+    """:return (name, arguments) if the expression is a single function call"""
+    expression = expression.strip()
+    call = _call_at(expression, 0) if expression[:1].isalpha() else None
+    return (call[0], call[1]) if call and call[2] == len(expression) else None
+
+
+def rewrite(query):
+    """:return str
+    Query with the calls of tag(), match() and lower() replaced by native XPath,
+    calls of functions which were replaced by user ones are kept"""
+    functions = {name: rewrite_call for name, (func, rewrite_call) in _REWRITES.items() if _registered(name) is func}
+    if not functions:
+        return query
+    parts = []
+    position = copied = 0
+    while position < len(query):
+        char = query[position]
+        if char in "'\"":
+            position = _skip_literal(query, position)
+            continue
+        if not char.isalpha() or position and (query[position - 1].isalnum() or query[position - 1] in _NAME_CHARS):
+            position += 1
+            continue
+        call = _call_at(query, position)
+        if call is None or call[0] not in functions:
+            position = _name_end(query, position)
+            continue
+        name, args, end = call
+        compared = _COMPARED_AFTER.match(query, end) or _COMPARED_BEFORE.search(query, 0, position)
+        replacement = functions[name](args, [compared.group(1)] if compared else None)
+        if replacement is None:
+            position = _name_end(query, position)
+            continue
+        parts.append(query[copied:position])
+        parts.append(replacement)
+        position = copied = end
+    parts.append(query[copied:])
+    return "".join(parts)
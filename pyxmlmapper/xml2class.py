@@ -1,6 +1,7 @@
 #!python
 # -*- coding: utf8 -*-
 
+import hashlib
 import logging
 from argparse import ArgumentParser
 from collections import OrderedDict
@@ -24,7 +25,12 @@ class Node(object):
         self.path = path
         self.relative_path = path.split("/")[-1] if "/" in path else path
         self._parent = parent
-        self.children = children or []
+        self.children = []
+        self._children_by_path = {}
+        # there is an element with more than one such child
+        self.repeated = False
+        for child in children or []:
+            self.add_child(child)
 
     @property
     def parent(self):
@@ -32,17 +38,22 @@ class Node(object):
 
     def add_child(self, node):
         self.children.append(node)
+        self._children_by_path[node.relative_path] = node
+
+    def get_child(self, relative_path):
+        return self._children_by_path.get(relative_path)
 
     @property
     def has_children(self):
         return len(self.children) > 0
 
     def has_same_child(self, node):
-        return sum([n.name == node.name for n in self.children]) > 1
+        child = self.get_child(node.relative_path)
+        return child is not None and child.repeated
 
     def has_same_siblings(self, node):
         if not self.parent: return False
-        return sum([n.name == node.name for n in self.parent.children]) > 1
+        return node.repeated
 
     def accept(self, visitor):
         visitor.visit(self)
@@ -58,53 +69,88 @@ class Node(object):
         return self.name
 
 
-def replace_ns(element):
-    ns = "{{{}}}".format(element.nsmap.get(element.prefix, ''))
-    prefix = "{}:".format(element.prefix) if element.prefix else ''
-    return element.tag.replace(ns, prefix)
+def strip(string):
+    return string.strip() if string else ''
 
 
-def remove_ns(element):
-    ns = "{{{}}}".format(element.nsmap.get(element.prefix, ''))
-    return element.tag.replace(ns, '')
+def comment(string):
+    """:return str
+    Value as one line to be placed into a comment"""
+    return " ".join(string.split()) if string else ''
 
 
-def replace_ns_in_path(path, nsmap):
-    result = path
-    for prefix, ns in nsmap.items():
-        ns = "{{{}}}".format(ns)
-        prefix = "{}:".format(prefix) if prefix else ''
-        result = result.replace(ns, prefix)
-    return result
-
-
-def strip(string):
-    return string.strip() if string else ''
+def is_date(value):
+    """tries to recognize date or datetime value"""
+    try:
+        if len(value) < 10: return False  # if value smaller than 10 symbols it's too hard to recognize date value
+        date_parser.parse(value)  # this line throws an exception if date_parser can't recognize value
+        return True
+    except Exception:
+        return False
 
 
 def upper_first_letter(string):
     return "{}{}".format(string[0].upper(), string[1:]) if string else ''
 
 
-def build_tree(element_tree):
-    current = None
-    for event, element in etree.iterwalk(element_tree, events=('start', 'end')):
+def local_name(element):
+    return element.tag.rpartition("}")[2]
+
+
+def qualified_name(element):
+    """:return str
+    Tag with prefix instead of namespace"""
+    prefix = element.prefix
+    return "{}:{}".format(prefix, local_name(element)) if prefix else local_name(element)
+
+
+def iter_events(source):
+    """:return generator of (event, element)
+    Walks a parsed tree or parses a file (path or file object) incrementally.
+    Parsed elements are removed when they are processed, so memory doesn't depend on document size"""
+    if hasattr(source, 'tag') or hasattr(source, 'getroot'):
+        yield from etree.iterwalk(source, events=('start', 'end'))
+        return
+    for event, element in etree.iterparse(source, events=('start', 'end'), recover=True, huge_tree=True):
+        yield event, element
+        if event == "end":
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            # comments and processing instructions before the root have no parent
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+
+def build_tree(source):
+    """:return Node
+    Builds the structure of the document, elements with the same path are merged into one node.
+    Time is linear in document size and memory is bounded by the number of distinct paths"""
+    root = None
+    stack = []  # (node, occurrences of children tags in the current element)
+    for event, element in iter_events(source):
+        if not isinstance(element.tag, str):
+            continue  # comments and processing instructions
         if event == "start":
-            node = Node(name=remove_ns(element),
-                        value=element.text,
-                        path=replace_ns_in_path(element_tree.getelementpath(element), element.nsmap),
-                        parent=current)
-            # if element has no text and it's not a root element then add him as a child and go deeper
-            if not strip(element.text):
-                if current is not None:
-                    current.add_child(node)
-                current = node
-            else:
-                current.add_child(node)
-        if event == "end":  # go upper
-            if not strip(element.text):
-                current = current.parent if current.parent else current
-    return current
+            if not stack:
+                root = root or Node(name=local_name(element), value=None, path="", parent=None)
+                stack.append((root, {}))
+                continue
+            parent, occurrences = stack[-1]
+            name = qualified_name(element)
+            node = parent.get_child(name)
+            if node is None:
+                path = "{}/{}".format(parent.path, name) if parent.path else name
+                node = Node(name=local_name(element), value=None, path=path, parent=parent)
+                parent.add_child(node)
+            occurrences[name] = occurrences.get(name, 0) + 1
+            if occurrences[name] > 1:
+                node.repeated = True
+            stack.append((node, {}))
+        if event == "end":
+            node, _ = stack.pop()
+            if not strip(node.value):
+                node.value = element.text
+    return root
 
 
 class PrintVisitor(object):
@@ -126,6 +172,31 @@ class PrintVisitor(object):
     pass
 
 
+class FingerprintVisitor(object):
+    """Calculates hash of the document structure.
+    Documents with the same fingerprint produce the same models (up to the values in comments)"""
+    def __init__(self):
+        self.level = 0
+        self._hash = hashlib.sha1()
+
+    def up(self):
+        self.level += 1
+
+    def down(self):
+        self.level -= 1
+
+    def visit(self, item):
+        if item.has_children:
+            kind = "object"
+        else:
+            kind = "date" if is_date(item.value) else "value"
+        line = "{}{} {} {} {}\n".format(" " * self.level, item.name, item.relative_path, kind, item.repeated)
+        self._hash.update(line.encode("utf8"))
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
 class CodeBuilder(object):
     def __init__(self):
         self.level = 0
@@ -160,15 +231,12 @@ class CodeBuilder(object):
     def add_value_field(self, item):
         if item.parent is None: return
         class_definition = self.models[item.parent.name]
-        # tries to recognize date or datetime value
-        try:
-            if len(item.value) < 10: raise Exception()  # if value smaller than 10 symbols it's too hard to recognize date value
-            date = date_parser.parse(item.value)  # this line throws an exception if date_parser can't recognize value
+        if is_date(item.value):
             attr_definition = ("\t{item.name} = base.DateTimeField('./{item.relative_path}')  # {comment}"
-                               .format(item=item, comment=strip(item.value)))
-        except:
+                               .format(item=item, comment=comment(item.value)))
+        else:
             attr_definition = ("\t{item.name} = base.ValueField('./{item.relative_path}')  # {comment}"
-                               .format(item=item, comment=strip(item.value)))
+                               .format(item=item, comment=comment(item.value)))
         class_definition.append(attr_definition)
 
     def add_object_field(self, item):
@@ -181,8 +249,8 @@ class CodeBuilder(object):
     def add_listvalue_field(self, item):
         if item.parent is None: return
         class_definition = self.models[item.parent.name]
-        attr_definition = ("\t{item.name}s = base.ListValueField('./{item.relative_path}', default={item.name}())  # {comment}"
-                           .format(item=item, comment=strip(item.value)))
+        attr_definition = ("\t{item.name}s = base.ListValueField('./{item.relative_path}')  # {comment}"
+                           .format(item=item, comment=comment(item.value)))
         class_definition.append(attr_definition)
 
     def add_listobject_field(self, item):
@@ -190,9 +258,6 @@ class CodeBuilder(object):
         class_definition = self.models[item.parent.name]
         attr_definition = ("\t{item.name}s: List[{classname}] = base.ListObjectField('./{item.relative_path}', {classname}, default={classname}())"
                            .format(item=item, classname=upper_first_letter(item.name)))
-        for line in class_definition:
-            if item.name in line:
-                return
         class_definition.append(attr_definition)
 
     def render_to_string(self):
@@ -207,8 +272,7 @@ class CodeBuilder(object):
 
 
 def create_classes_from_file(filename):
-    xml = etree.parse(filename)
-    obj_tree = build_tree(xml)
+    obj_tree = build_tree(filename)
     builder_visitor = CodeBuilder()
     obj_tree.iterwalk(builder_visitor)
     result = builder_visitor.render_to_string()
@@ -229,8 +293,7 @@ def create_classes_from_string(xml_string):
 def main():
     args = arg_parser.parse_args()
     print("#  {}\n\n".format(args.filename))
-    xml = etree.parse(args.filename)
-    obj_tree = build_tree(xml)
+    obj_tree = build_tree(args.filename)
     builder_visitor = CodeBuilder()
     obj_tree.iterwalk(builder_visitor)
     print(builder_visitor.render_to_string())
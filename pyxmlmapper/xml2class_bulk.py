@@ -2,14 +2,175 @@
 # -*- coding: utf8 -*-
 import argparse
 import glob
+import hashlib
+import json
 import os
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+from itertools import chain, groupby
+
 from pyxmlmapper import xml2class
 
 interface = argparse.ArgumentParser(description="Creates models from xml for pyxmlmapper lib")
 interface.add_argument("in_dir", help="input directory, default - current directory", default="./")
 interface.add_argument("out_dir", help="output directory, default - current directory", default="./")
 interface.add_argument("-z", "--from_zip", help="gets files from zip archive", action="store_true")
+interface.add_argument("-w", "--workers", help="number of worker processes, default - 1", type=int, default=1)
+interface.add_argument("-i", "--incremental", action="store_true",
+                       help="skips files which are not changed since the previous run and creates "
+                            "one module per distinct document structure, see manifest.json in out_dir")
+
+MANIFEST = "manifest.json"
+# members of an archive are split into this number of batches per worker,
+# a batch is processed by one task which opens the archive once
+BATCHES_PER_WORKER = 4
+
+
+def iter_sources(in_path, from_zip):
+    """:return generator of (zip archive or None, filename)
+    Files are sorted by name, zip members keep the archive order"""
+    for item in sorted(glob.glob(in_path)):
+        if not from_zip:
+            yield None, item
+        elif zipfile.is_zipfile(item):
+            with zipfile.ZipFile(item) as xml_zip:
+                for name in xml_zip.namelist():
+                    if name.endswith("xml"):
+                        yield item, name
+
+
+def source_key(source):
+    archive, filename = source
+    return filename if archive is None else "{}/{}".format(archive, filename)
+
+
+def iter_batches(sources, workers=1):
+    """:return generator of lists of sources
+    Sources of the same archive are split into BATCHES_PER_WORKER batches per worker"""
+    for _, group in groupby(sources, key=lambda source: source[0]):
+        group = list(group)
+        size = -(-len(group) // (workers * BATCHES_PER_WORKER))
+        for start in range(0, len(group), size):
+            yield group[start:start + size]
+
+
+@contextmanager
+def open_archive(archive):
+    """:return context manager of zipfile.ZipFile or None if archive is None (plain files)
+    The central directory of an archive is read once for all the members of a batch"""
+    if archive is None:
+        yield None
+    else:
+        with zipfile.ZipFile(archive) as xml_zip:
+            yield xml_zip
+
+
+def open_member(xml_zip, filename):
+    """:return binary file object of the plain file or the zip member, members are read without extracting"""
+    return open(filename, "rb") if xml_zip is None else xml_zip.open(filename)
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def create_models(batch, out_path):
+    """:return list of (filename, seconds)
+    Creates models for the files or zip members of the batch and writes them to out_path"""
+    results = []
+    with open_archive(batch[0][0]) as xml_zip:
+        for _, filename in batch:
+            start = time.perf_counter()
+            with open_member(xml_zip, filename) as xml_io:
+                models = xml2class.create_classes_from_file(xml_io)
+            with open(os.path.join(out_path, filename + ".py"), "w", encoding="utf8") as fh:
+                fh.write(models)
+            results.append((filename, time.perf_counter() - start))
+    return results
+
+
+def create_structure_models(jobs):
+    """:return list of dicts
+    jobs - list of (source, known content hash or None) of one batch.
+    Creates models for the files or zip members whose content hash differs from the known one.
+    Models are returned with the structure fingerprint instead of being written"""
+    results = []
+    with open_archive(jobs[0][0][0]) as xml_zip:
+        for source, known_hash in jobs:
+            start = time.perf_counter()
+            with open_member(xml_zip, source[1]) as xml_io:
+                data = xml_io.read()
+            result = {"key": source_key(source), "hash": content_hash(data), "fingerprint": None, "models": None}
+            if result["hash"] != known_hash:
+                obj_tree = xml2class.build_tree(BytesIO(data))
+                fingerprint_visitor = xml2class.FingerprintVisitor()
+                obj_tree.iterwalk(fingerprint_visitor)
+                builder_visitor = xml2class.CodeBuilder()
+                obj_tree.iterwalk(builder_visitor)
+                result["fingerprint"] = fingerprint_visitor.hexdigest()
+                result["models"] = builder_visitor.render_to_string()
+            result["seconds"] = time.perf_counter() - start
+            results.append(result)
+    return results
+
+
+def load_manifest(out_path):
+    try:
+        with open(os.path.join(out_path, MANIFEST), encoding="utf8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"files": {}}
+
+
+def process_incremental(batches, out_path, mapper):
+    """Writes one module per distinct structure and manifest.json:
+    {"files": {input file: {"hash": content hash, "module": module name}}}"""
+    manifest = load_manifest(out_path)
+    known = {key: item for key, item in manifest["files"].items()
+             if os.path.exists(os.path.join(out_path, item["module"] + ".py"))}
+    jobs = ([(source, known.get(source_key(source), {}).get("hash")) for source in batch] for batch in batches)
+    files = {}
+    for result in chain.from_iterable(mapper(create_structure_models, jobs)):
+        key = result["key"]
+        if result["models"] is None:
+            files[key] = known[key]
+            print("{} not changed".format(key))
+            continue
+        module = "schema_{}".format(result["fingerprint"][:16])
+        module_filename = os.path.join(out_path, module + ".py")
+        if not os.path.exists(module_filename):
+            with open(module_filename, "w", encoding="utf8") as fh:
+                fh.write(result["models"])
+        files[key] = {"hash": result["hash"], "module": module}
+        print("{} -> {} {:.3f}s".format(key, module, result["seconds"]))
+    used_modules = {item["module"] for item in files.values()}
+    for item in manifest["files"].values():
+        module_filename = os.path.join(out_path, item["module"] + ".py")
+        if item["module"] not in used_modules and os.path.exists(module_filename):
+            os.remove(module_filename)
+    with open(os.path.join(out_path, MANIFEST), "w", encoding="utf8") as fh:
+        json.dump({"files": files}, fh, indent=2, sort_keys=True)
+
+
+def process(in_path, out_path, from_zip=False, workers=1, incremental=False):
+    batches = iter_batches(iter_sources(in_path, from_zip), workers)
+    start = time.perf_counter()
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    mapper = executor.map if executor else map
+    try:
+        if incremental:
+            process_incremental(batches, out_path, mapper)
+        else:
+            for filename, seconds in chain.from_iterable(mapper(partial(create_models, out_path=out_path), batches)):
+                print("{} {:.3f}s".format(filename, seconds))
+    finally:
+        if executor:
+            executor.shutdown()
+    print("done in {:.3f}s".format(time.perf_counter() - start))
 
 
 def main():
@@ -19,25 +180,7 @@ def main():
     extension = "*.zip" if args.from_zip else "*.xml"
     in_path = os.path.join(in_path, extension)
     print("in_dir: {}, out_dir: {}".format(in_path, out_path))
-    for item in glob.glob(in_path):
-        print("processing {}".format(item))
-        if args.from_zip:
-            if zipfile.is_zipfile(item):
-                xml_zip = zipfile.ZipFile(item)
-                for item in xml_zip.namelist():
-                    if not item.endswith("xml"):
-                        continue
-                    print(item)
-                    xml_io = xml_zip.open(item)
-                    models = xml2class.create_classes_from_file(xml_io)
-                    py_filename = item + ".py"
-                    with open(os.path.join(out_path, py_filename), "w") as fh:
-                        fh.write(models)
-        else:
-            models = xml2class.create_classes_from_file(item)
-            py_filename = item + ".py"
-            with open(os.path.join(out_path, py_filename), "w") as fh:
-                fh.write(models)
+    process(in_path, out_path, args.from_zip, args.workers, args.incremental)
 
 
 if __name__ == "__main__":
@@ -11,6 +11,7 @@ setup(
     author_email='sign.rx@ya.ru',
     description='Declarative xml mapping library',
     install_requires=['lxml', 'python-dateutil'],
+    extras_require={'numpy': ['numpy']},
     long_description=open(join(dirname(__file__), 'README.md')).read(),
     scripts=['pyxmlmapper/xml2class.py', 'pyxmlmapper/xml2class_bulk.py']
 )
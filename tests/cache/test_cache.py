@@ -0,0 +1,135 @@
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from functools import partial
+from unittest import mock
+
+from pyxmlmapper import base, cache
+
+order = b"""<PurchaseOrder Number="1"><Created>2019-08-29</Created>
+    <Item><Quantity>1</Quantity></Item><Item><Quantity>2</Quantity></Item></PurchaseOrder>"""
+
+
+class Item(base.BaseXmlParser):
+    quantity = base.ValueField("Quantity", pytype=int)
+
+
+def create_model(query="@Number", pytype=int, default=0, item=Item):
+    return type("PurchaseOrder", (base.BaseXmlParser,), {
+        "__result_cache__": cache.ResultCache(),
+        "number": base.ValueField(query, pytype=pytype, default=default),
+        "created": base.DateTimeField("Created"),
+        "items": base.ListObjectField("Item", item),
+    })
+
+
+def convert(value, scale):
+    return int(value) * scale if value in {"1", "2", "3"} else [int(digit) for digit in value]
+
+
+# converters with nested code objects, frozenset constants, partials and closures
+Converted = create_model(pytype=partial(convert, scale=2), item=type("Item", (base.BaseXmlParser,), {
+    "quantity": base.ValueField("Quantity", pytype=lambda value: sorted({int(digit) for digit in value})),
+}))
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_should_be_equal_for_equal_models(self):
+        self.assertEqual(create_model().fingerprint(), create_model().fingerprint())
+
+    def test_should_change_with_fields(self):
+        fingerprint = create_model().fingerprint()
+        self.assertNotEqual(fingerprint, create_model(query="@Id").fingerprint())
+        self.assertNotEqual(fingerprint, create_model(pytype=float).fingerprint())
+        self.assertNotEqual(fingerprint, create_model(default=-1).fingerprint())
+
+    def test_should_change_with_nested_models(self):
+        class OtherItem(base.BaseXmlParser):
+            quantity = base.ValueField("Quantity", pytype=float)
+        OtherItem.__qualname__ = Item.__qualname__
+        self.assertNotEqual(create_model().fingerprint(), create_model(item=OtherItem).fingerprint())
+
+    def test_should_change_with_converter_code(self):
+        self.assertNotEqual(create_model(pytype=lambda value: int(value)).fingerprint(),
+                            create_model(pytype=lambda value: -int(value)).fingerprint())
+        self.assertNotEqual(create_model(pytype=partial(convert, scale=2)).fingerprint(),
+                            create_model(pytype=partial(convert, scale=3)).fingerprint())
+
+    def test_should_change_with_captured_values(self):
+        def scaled(scale):
+            return lambda value: int(value) * scale
+        self.assertNotEqual(create_model(pytype=scaled(2)).fingerprint(), create_model(pytype=scaled(3)).fingerprint())
+
+    def test_should_be_equal_in_processes(self):
+        script = "from tests.cache.test_cache import Converted; print(Converted.fingerprint())"
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        fingerprints = {subprocess.run([sys.executable, "-c", script], cwd=root, check=True, stdout=subprocess.PIPE,
+                                       universal_newlines=True, env=dict(os.environ, PYTHONHASHSEED=seed)).stdout
+                        for seed in ("1", "2")}
+        self.assertEqual({Converted.fingerprint() + "\n"}, fingerprints)
+
+    def test_should_reject_objects_with_addresses(self):
+        self.assertRaises(ValueError, create_model(default=object()).fingerprint)
+
+
+class TestResultCache(unittest.TestCase):
+    def test_should_skip_parsing_of_repeated_documents(self):
+        model = create_model()
+        expected = model.extract(order)
+        with mock.patch.object(model, "parse", side_effect=AssertionError):
+            self.assertEqual(expected, model.extract(order))
+        self.assertEqual((1, 1), (model.__result_cache__.hits, model.__result_cache__.misses))
+        self.assertEqual(datetime(2019, 8, 29), expected["created"])
+
+    def test_should_return_copies(self):
+        model = create_model()
+        model.extract(order)["items"].clear()
+        self.assertEqual([{"quantity": 1}, {"quantity": 2}], model.extract(order)["items"])
+
+    def test_should_evict_least_recently_used_results(self):
+        results = cache.ResultCache(maxsize=1)
+        results.extract(Item, b"<Item/>", dict)
+        results.extract(Item, b"<Item><Quantity>1</Quantity></Item>", dict)
+        results.extract(Item, b"<Item/>", dict)
+        self.assertEqual((0, 3), (results.hits, results.misses))
+
+    def test_should_not_find_results_of_changed_model(self):
+        results = cache.ResultCache()
+        first, second = create_model(), create_model(pytype=str)
+        first.__result_cache__ = second.__result_cache__ = results
+        self.assertEqual(1, first.extract(order)["number"])
+        self.assertEqual("1", second.extract(order)["number"])
+
+    def test_should_cache_results_of_files(self):
+        model = create_model()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "order.xml")
+            with open(path, "wb") as fh:
+                fh.write(order)
+            model.to_columns([pathlib.Path(path), order])
+        self.assertEqual((1, 1), (model.__result_cache__.hits, model.__result_cache__.misses))
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def test_should_keep_results_between_caches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            storage = cache.SqliteStorage(os.path.join(directory, "results.db"))
+            model = create_model()
+            expected = model.extract(order)
+            model.__result_cache__ = cache.ResultCache(storage)
+            model.extract(order)
+            model.__result_cache__ = cache.ResultCache(storage)
+            with mock.patch.object(model, "parse", side_effect=AssertionError):
+                self.assertEqual(expected, model.extract(order))
+            self.assertEqual(1, model.__result_cache__.hits)
+            storage.clear()
+            self.assertIsNone(storage.get(model.__result_cache__.key(model, order)))
+            storage._connection().close()
+
+
+if __name__ == '__main__':
+    unittest.main()
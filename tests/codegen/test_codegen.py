@@ -0,0 +1,88 @@
+import io
+import unittest
+from unittest import mock
+
+from pyxmlmapper import base, stats
+from pyxmlmapper.components import codegen
+
+xml = """<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com" aw:OrderDate="1999-10-20">
+  <aw:DeliveryNotes>Please leave packages in shed by driveway.</aw:DeliveryNotes>
+  <aw:Empty/>
+  <aw:Items>
+    <aw:Item aw:PartNumber="872-AA"><aw:Quantity>1</aw:Quantity><aw:Price>148.95</aw:Price></aw:Item>
+    <aw:Item aw:PartNumber="926-AA"><aw:Quantity>2</aw:Quantity><aw:Price>39.98</aw:Price></aw:Item>
+  </aw:Items>
+</aw:PurchaseOrder>"""
+
+
+class Item(base.BaseXmlParser):
+    __namespaces__ = {"aw": "http://www.adventure-works.com"}
+
+    part_number = base.ValueField("@aw:PartNumber")
+    quantity = base.ValueField("aw:Quantity", pytype=int)
+    price = base.ValueField("aw:Price", pytype=float)
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    order_date = base.DateTimeField("@aw:OrderDate")
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+    empty = base.ValueField("aw:Empty")
+    missing = base.ValueField("aw:Missing", pytype=int, default=-1)
+    count = base.ValueField("count(aw:Items/aw:Item)", pytype=int)
+    quantities = base.ListValueField("aw:Items/aw:Item/aw:Quantity", pytype=int)
+    first_item = base.ObjectField("aw:Items/aw:Item", Item)
+    items = base.ListObjectField("aw:Items/aw:Item", Item)
+
+
+class StrictPurchaseOrder(base.BaseXmlParser):
+    missing = base.ValueField("aw:Missing", strict=True)
+
+
+class BrokenPurchaseOrder(base.BaseXmlParser):
+    delivery_notes = base.ValueField("aw:DeliveryNotes", pytype=int)
+
+
+class TestCodegen(unittest.TestCase):
+    def test_extractor_should_return_the_same_as_fields(self):
+        for model in (PurchaseOrder, Item):
+            doc = model.parse(xml)
+            self.assertEqual(model._extract_fields(doc), model.extract(doc))
+        self.assertEqual(Item._extract_fields(None), Item.extract(None))
+
+    def test_extractor_should_be_generated_once(self):
+        self.assertIs(PurchaseOrder.extractor(), PurchaseOrder.extractor())
+        self.assertIn("'delivery_notes': value_1", PurchaseOrder.extractor().source)
+
+    def test_readers_should_return_the_same_as_fields(self):
+        order = PurchaseOrder(xml)
+        for name in ("delivery_notes", "empty", "missing", "count"):
+            field = vars(PurchaseOrder)[name]
+            self.assertEqual(base.ValueField.value(field, order.document), getattr(order, name), name)
+
+    def test_should_raise_errors_of_fields(self):
+        self.assertRaises(base.NotFoundException, lambda: StrictPurchaseOrder(xml).missing)
+        self.assertRaises(base.NotFoundException, lambda: StrictPurchaseOrder.extract(xml))
+        self.assertRaises(TypeError, lambda: BrokenPurchaseOrder(xml).delivery_notes)
+        self.assertRaises(TypeError, lambda: BrokenPurchaseOrder.extract(xml))
+
+    def test_should_call_fields_while_stats_are_enabled(self):
+        stats.reset()
+        stats.enable()
+        try:
+            PurchaseOrder.extract(xml)
+        finally:
+            stats.disable()
+        self.assertEqual(1, stats.snapshot()["PurchaseOrder.delivery_notes"]["count"])
+        stats.reset()
+
+    def test_should_dump_source(self):
+        class Order(base.BaseXmlParser):
+            notes = base.ValueField("aw:DeliveryNotes")
+
+        with mock.patch.object(codegen, "dump_source", True), mock.patch("sys.stderr", new=io.StringIO()) as err:
+            Order.extract(xml)
+        self.assertIn("def extract(doc, doc_namespaces=None):", err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
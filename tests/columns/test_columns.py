@@ -0,0 +1,99 @@
+import unittest
+from array import array
+
+from pyxmlmapper import base, cache
+from pyxmlmapper.components import columns
+
+orders = [
+    b"""<PurchaseOrder Number="1"><Total>10.5</Total><Notes>first</Notes>
+        <Item><Quantity>1</Quantity></Item><Item><Quantity>2</Quantity></Item></PurchaseOrder>""",
+    b"""<PurchaseOrder><Notes>second</Notes></PurchaseOrder>""",
+    b"""<PurchaseOrder Number="3"><Total>7</Total>
+        <Item><Quantity>5</Quantity></Item></PurchaseOrder>""",
+]
+
+
+class Item(base.BaseXmlParser):
+    quantity = base.ValueField("Quantity", pytype=int)
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    number = base.ValueField("@Number", pytype=int)
+    total = base.ValueField("Total", pytype=float)
+    notes = base.ValueField("Notes")
+    quantities = base.ListValueField("Item/Quantity", pytype=int)
+    items = base.ListObjectField("Item", Item)
+
+
+class Payment(base.BaseXmlParser):
+    account = base.ValueField("@Account", pytype=int, default=0)
+    amount = base.ValueField("Amount", pytype=float, default=0.0)
+    parts = base.ListValueField("Part", pytype=int)
+
+
+payments = [
+    b"""<Payment Account="5"><Amount>0</Amount><Part>1</Part></Payment>""",
+    b"""<Payment><Part>2</Part></Payment>""",
+    b"""<Payment Account="123456789012345678901234"><Amount>1.5</Amount><Part>123456789012345678901234</Part>
+        </Payment>""",
+]
+
+
+class TestColumns(unittest.TestCase):
+    def test_should_collect_columns_into_arrays(self):
+        result = PurchaseOrder.to_columns(orders, use_numpy=False)
+        self.assertEqual(columns.NumericColumn(array("q", [1, 0, 3]), array("B", [0, 1, 0])), result["number"])
+        self.assertEqual(columns.NumericColumn(array("d", [10.5, 0, 7]), array("B", [0, 1, 0])), result["total"])
+        self.assertEqual(["first", "second", ""], result["notes"])
+        self.assertEqual(columns.ListColumn(array("q", [0, 2, 2, 3]), array("q", [1, 2, 5])), result["quantities"])
+        self.assertEqual([{"quantity": 1}, {"quantity": 2}, {"quantity": 5}], result["items"].values)
+
+    def test_should_accept_elements(self):
+        result = PurchaseOrder.to_columns([PurchaseOrder.parse(xml) for xml in orders], use_numpy=False)
+        self.assertEqual(["first", "second", ""], result["notes"])
+
+    def test_should_mask_values_which_are_not_found(self):
+        result = Payment.to_columns(payments[:2], use_numpy=False)
+        self.assertEqual(columns.NumericColumn(array("q", [5, 0]), array("B", [0, 1])), result["account"])
+        self.assertEqual(columns.NumericColumn(array("d", [0, 0]), array("B", [0, 1])), result["amount"])
+        self.assertEqual({"account": 0, "amount": 0.0, "parts": [2]}, Payment.extract(payments[1]))
+
+    def test_should_keep_big_integers(self):
+        result = Payment.to_columns(payments, use_numpy=False)
+        self.assertEqual(columns.NumericColumn([5, 0, 123456789012345678901234], array("B", [0, 1, 0])),
+                         result["account"])
+        self.assertEqual(columns.ListColumn(array("q", [0, 1, 2, 3]), [1, 2, 123456789012345678901234]),
+                         result["parts"])
+
+    def test_should_mask_values_of_cached_results(self):
+        model = type("CachedPayment", (Payment,), {"__result_cache__": cache.ResultCache()})
+        first, second = model.to_columns(payments[:2], use_numpy=False), model.to_columns(payments[:2], use_numpy=False)
+        self.assertEqual(first, second)
+        self.assertEqual(array("B", [0, 1]), second["account"].mask)
+        self.assertEqual(2, model.__result_cache__.hits)
+        self.assertEqual(0, model.extract(payments[1])["account"])
+
+    @unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_should_convert_masks_and_big_integers_to_numpy(self):
+        result = Payment.to_columns(payments)
+        self.assertEqual([False, True, False], result["account"].mask.tolist())
+        self.assertEqual("object", str(result["account"].values.dtype))
+        self.assertEqual([5, 0, 123456789012345678901234], result["account"].values.tolist())
+        self.assertEqual([0.0, 0.0, 1.5], result["amount"].values.tolist())
+        self.assertEqual([False, True, False], result["amount"].mask.tolist())
+
+    @unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_should_collect_columns_into_numpy_arrays(self):
+        result = PurchaseOrder.to_columns(orders)
+        self.assertEqual([1, 0, 3], result["number"].values.tolist())
+        self.assertEqual([False, True, False], result["number"].mask.tolist())
+        self.assertEqual([0, 2, 2, 3], result["quantities"].offsets.tolist())
+        self.assertEqual("float64", str(result["total"].values.dtype))
+
+    @unittest.skipIf(columns.numpy is not None, "NumPy is installed")
+    def test_should_require_numpy(self):
+        self.assertRaises(ImportError, lambda: PurchaseOrder.to_columns(orders, use_numpy=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
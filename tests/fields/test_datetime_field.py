@@ -1,7 +1,22 @@
 import unittest
 from datetime import datetime
 
-from pyxmlmapper.components.fields import DateTimeField
+from pyxmlmapper import base
+from pyxmlmapper.components.fields import DateTimeField, ListDateTimeField
+
+xml = """
+<Items>
+  <Item ShipDate="20.10.1999" />
+  <Item ShipDate="21.10.1999" />
+  <Item ShipDate="20.10.1999" />
+  <Item ShipDate="1999-10-22T10:30:00" />
+</Items>
+"""
+
+
+class Items(base.BaseXmlParser):
+    ship_date = DateTimeField("Item/@ShipDate", formats=["%d.%m.%Y"])
+    ship_dates = ListDateTimeField("Item/@ShipDate", formats=["%d.%m.%Y"], cache_size=16)
 
 
 class TestDateTimeField(unittest.TestCase):
@@ -20,6 +35,41 @@ class TestDateTimeField(unittest.TestCase):
         date = "1err"
         self.assertEqual(datetime(1970, 2, 1), field.convert_date(date, datetime(1970, 2, 1)))
 
+    def test_should_convert_date_with_formats(self):
+        field = DateTimeField("", formats=["%Y%m%d", "%d.%m.%Y %H:%M"])
+        self.assertEqual(datetime(2021, 2, 1), field.convert_date("20210201", None))
+        self.assertEqual(datetime(2021, 2, 1, 10, 30), field.convert_date("01.02.2021 10:30", None))
+
+    def test_should_convert_iso_date(self):
+        field = DateTimeField("")
+        self.assertEqual(datetime(2021, 2, 1, 10, 30, 15), field.convert_date("2021-02-01T10:30:15", None))
+
+    def test_should_not_use_iso_format_if_dayfirst(self):
+        field = DateTimeField("", dayfirst=True)
+        self.assertEqual(datetime(2021, 1, 2), field.convert_date("2021-02-01", None))
+
+    def test_should_fall_back_to_dateutil(self):
+        field = DateTimeField("", formats=["%d.%m.%Y"])
+        self.assertEqual(datetime(2021, 2, 1), field.convert_date("Feb 1 2021", None))
+
+    def test_should_cache_parsed_dates(self):
+        field = DateTimeField("", cache_size=2)
+        field.convert_date("01-02-2021", None)
+        field.convert_date("01-02-2021", None)
+        self.assertEqual(1, field._parse_date.cache_info().hits)
+
+
+class TestListDateTimeField(unittest.TestCase):
+    def test_should_convert_first_date(self):
+        self.assertEqual(datetime(1999, 10, 20), Items(xml).ship_date)
+
+    def test_should_convert_all_dates(self):
+        self.assertEqual([datetime(1999, 10, 20), datetime(1999, 10, 21), datetime(1999, 10, 20),
+                          datetime(1999, 10, 22, 10, 30)], Items(xml).ship_dates.all())
+
+    def test_should_extract_dates(self):
+        self.assertEqual(Items(xml).ship_dates.all(), Items.extract(xml)['ship_dates'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+
+from pyxmlmapper import base
+
+xml1 = """
+<PurchaseOrder>
+  <Address Type="Shipping">
+    <Name>Ellen Adams</Name>
+  </Address>
+  <DeliveryNotes>Please leave packages in shed by driveway.</DeliveryNotes>
+</PurchaseOrder>
+"""
+
+xml2 = """
+<PurchaseOrder>
+  <Address Type="Shipping">
+    <Name>Tai Yee</Name>
+  </Address>
+  <DeliveryNotes>Please ring the bell.</DeliveryNotes>
+</PurchaseOrder>
+"""
+
+
+class Address(base.BaseXmlParser):
+    name = base.ValueField("Name")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    address = base.ObjectField("Address", Address)
+    delivery_notes = base.ValueField("DeliveryNotes")
+
+
+class CachedPurchaseOrder(PurchaseOrder):
+    __cache_fields__ = True
+
+
+class PurchaseOrderWithCachedField(base.BaseXmlParser):
+    address = base.ObjectField("Address", Address, cache=True)
+    address_not_cached = base.ObjectField("Address", Address)
+
+
+class TestFieldsCache(unittest.TestCase):
+    def test_should_not_cache_by_default(self):
+        order = PurchaseOrder(xml1)
+        self.assertIsNot(order.address, order.address)
+
+    def test_should_cache_fields_of_model(self):
+        order = CachedPurchaseOrder(xml1)
+        self.assertIs(order.address, order.address)
+        self.assertEqual("Please leave packages in shed by driveway.", order.delivery_notes)
+
+    def test_should_cache_single_field(self):
+        order = PurchaseOrderWithCachedField(xml1)
+        self.assertIs(order.address, order.address)
+        self.assertIsNot(order.address_not_cached, order.address_not_cached)
+
+    def test_should_clear_cache_on_set_document(self):
+        order = CachedPurchaseOrder(xml1)
+        self.assertEqual("Ellen Adams", order.address.name)
+        order.set_document(xml2)
+        self.assertEqual("Tai Yee", order.address.name)
+        self.assertEqual("Please ring the bell.", order.delivery_notes)
+
+    def test_instances_should_not_share_cache(self):
+        order1 = CachedPurchaseOrder(xml1)
+        order2 = CachedPurchaseOrder(xml2)
+        self.assertEqual("Ellen Adams", order1.address.name)
+        self.assertEqual("Tai Yee", order2.address.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
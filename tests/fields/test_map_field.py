@@ -0,0 +1,76 @@
+import unittest
+
+from pyxmlmapper import base
+
+xml = """
+<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com">
+  <aw:Items>
+    <aw:Item aw:PartNumber="872-AA"><aw:ProductName>Lawnmower</aw:ProductName></aw:Item>
+    <aw:Item aw:PartNumber="926-AA"><aw:ProductName>Baby Monitor</aw:ProductName></aw:Item>
+    <aw:Item aw:PartNumber="926-AA"><aw:ProductName>Baby Monitor 2</aw:ProductName></aw:Item>
+    <aw:Item><aw:ProductName>No part number</aw:ProductName></aw:Item>
+  </aw:Items>
+</aw:PurchaseOrder>
+"""
+
+
+class Item(base.BaseXmlParser):
+    created = 0
+
+    def __init__(self, doc=None):
+        super().__init__(doc)
+        type(self).created += 1
+
+    product_name = base.ValueField("aw:ProductName")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    items = base.MapField(".//aw:Item", Item, key="@aw:PartNumber")
+    last_items = base.MapField(".//aw:Item", Item, key="@aw:PartNumber", duplicates="last")
+    all_items = base.MapField(".//aw:Item", Item, key="@aw:PartNumber", duplicates="list")
+    items_by_name = base.MapField(".//aw:Item", Item, key="aw:ProductName")
+    missing = base.MapField(".//aw:Missing", Item)
+
+
+class TestMapField(unittest.TestCase):
+    def setUp(self) -> None:
+        self.order = PurchaseOrder(xml)
+        Item.created = 0
+
+    def test_should_map_keys_to_objects(self):
+        self.assertEqual(["872-AA", "926-AA"], list(self.order.items))
+        self.assertEqual("Lawnmower", self.order.items["872-AA"].product_name)
+        self.assertEqual("Baby Monitor", self.order.items["926-AA"].product_name)
+        self.assertIn("Lawnmower", self.order.items_by_name)
+        self.assertEqual({}, dict(self.order.missing))
+
+    def test_should_apply_duplicates_policy(self):
+        self.assertEqual("Baby Monitor 2", self.order.last_items["926-AA"].product_name)
+        self.assertEqual(["Baby Monitor", "Baby Monitor 2"],
+                         [item.product_name for item in self.order.all_items["926-AA"]])
+
+    def test_should_create_objects_once_on_demand(self):
+        items = self.order.items
+        self.assertEqual(2, len(items))
+        self.assertEqual(0, Item.created)
+        self.assertIs(items["872-AA"], self.order.items["872-AA"])
+        self.assertEqual(1, Item.created)
+        self.assertRaises(KeyError, lambda: items["000-AA"])
+
+    def test_should_be_read_only(self):
+        def assign():
+            self.order.items["000-AA"] = Item()
+        self.assertRaises(TypeError, assign)
+
+    def test_should_extract_dicts(self):
+        result = PurchaseOrder.extract(xml)
+        self.assertEqual({"872-AA": {"product_name": "Lawnmower"}, "926-AA": {"product_name": "Baby Monitor"}},
+                         result["items"])
+        self.assertEqual(2, len(result["all_items"]["926-AA"]))
+
+    def test_should_check_duplicates_policy(self):
+        self.assertRaises(ValueError, lambda: base.MapField(".//aw:Item", Item, duplicates="any"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 import unittest
+from unittest import mock
 from lxml import etree
 from lxml.etree import XPathSyntaxError
 
 from pyxmlmapper import base
+from pyxmlmapper.components import fields
 from pyxmlmapper.components.exceptions import NotFoundException
-from pyxmlmapper.components.fields import XmlField
+from pyxmlmapper.components.fields import XmlField, compile_query
 
 xml = """
 <PurchaseOrder PurchaseOrderNumber="99503" OrderDate="1999-10-20" EmptyDate="">  
@@ -46,7 +48,9 @@ xml = """
 class TestXmlFieldExecQuery(unittest.TestCase):
     def setUp(self) -> None:
         self.doc = etree.fromstring(xml)
-        XmlField._namespaces = {"auto": True}
+        patcher = mock.patch.object(XmlField, "_namespaces", {"auto": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_should_return_one_element(self):
         expression = "//Address[1]/Name"
@@ -81,7 +85,9 @@ class TestXmlFieldExecQuery(unittest.TestCase):
 class TestXmlFieldValue(unittest.TestCase):
     def setUp(self) -> None:
         self.doc = etree.fromstring(xml)
-        XmlField._namespaces = {"auto": True}
+        patcher = mock.patch.object(XmlField, "_namespaces", {"auto": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_should_return_value(self):
         expression = "//Address[1]/Name"
@@ -105,11 +111,34 @@ class TestXmlFieldValue(unittest.TestCase):
         self.assertEqual(2, len(found))
         self.assertEqual(found[0].text, field.value(self.doc))
 
+    def test_should_return_default_as_is(self):
+        default = object()
+        field = XmlField("//does_not_exists", pytype=int, default=default)
+        self.assertIs(default, field.value(self.doc))
+
+    def test_should_return_scalar_results(self):
+        self.assertEqual("Ellen Adams", XmlField("string(//Address[1]/Name)").value(self.doc))
+        self.assertEqual(2, XmlField("count(//Address)", pytype=int).value(self.doc))
+        self.assertIs(int, type(XmlField("count(//Address)", pytype=int).value(self.doc)))
+
+    def test_should_return_plain_strings(self):
+        for expression in ("@PurchaseOrderNumber", "//Address[1]/Name/text()", "string(//Address[1]/@Type)"):
+            value = XmlField(expression).value(self.doc)
+            self.assertIs(str, type(value), expression)
+        self.assertEqual("99503", XmlField("@PurchaseOrderNumber").value(self.doc))
+
+    def test_should_convert_text_of_element(self):
+        self.assertEqual(1, XmlField("//Item[1]/Quantity", pytype=int).value(self.doc))
+        self.assertEqual(148.95, XmlField("//Item[1]/USPrice", pytype=float).value(self.doc))
+        self.assertEqual(99503, XmlField("@PurchaseOrderNumber", pytype=int).value(self.doc))
+
 
 class TestXmlFieldListValue(unittest.TestCase):
     def setUp(self) -> None:
         self.doc = etree.fromstring(xml)
-        XmlField._namespaces = {"auto": True}
+        patcher = mock.patch.object(XmlField, "_namespaces", {"auto": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_should_return_list_of_values(self):
         expression = "//Address/Name"
@@ -135,7 +164,9 @@ class TestXmlFieldObject(unittest.TestCase):
 
     def setUp(self) -> None:
         self.doc = etree.fromstring(xml)
-        XmlField._namespaces = {"auto": True}
+        patcher = mock.patch.object(XmlField, "_namespaces", {"auto": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_should_return_object(self):
         expression = "//Address[1]"
@@ -164,5 +195,53 @@ class TestXmlFieldObject(unittest.TestCase):
         self.assertEqual(found[0].text, field.object(self.doc).name)
 
 
+class TestXmlFieldObjectsList(unittest.TestCase):
+    class Address(base.BaseXmlParser):
+        created = 0
+
+        def __init__(self, doc=None):
+            super().__init__(doc)
+            type(self).created += 1
+
+        name = base.ValueField("Name")
+
+    def setUp(self) -> None:
+        self.doc = etree.fromstring(xml)
+        self.Address.created = 0
+        patcher = mock.patch.object(XmlField, "_namespaces", {"auto": True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_should_create_objects_on_demand(self):
+        field = XmlField("//Address", pytype=self.Address)
+        addresses = field.objects_list(self.doc)
+        self.assertEqual(2, len(addresses))
+        self.assertEqual(0, self.Address.created)
+        self.assertEqual("Tai Yee", addresses[1].name)
+        self.assertIs(addresses[1], addresses.last())
+        self.assertEqual(1, self.Address.created)
+        self.assertEqual(["Ellen Adams"], [address.name for address in addresses[:1]])
+        self.assertEqual(2, self.Address.created)
+
+
+class TestXmlFieldQueryCache(unittest.TestCase):
+    class Item(base.BaseXmlParser):
+        __namespaces__ = {'aw': 'http://www.adventure-works.com'}
+
+        product_name = base.ValueField("aw:ProductName")
+
+    def test_should_compile_query_once(self):
+        namespaces = {'aw': 'http://www.adventure-works.com'}
+        self.assertIs(compile_query("aw:Name", namespaces), compile_query("aw:Name", dict(namespaces)))
+
+    def test_should_compile_query_per_namespaces(self):
+        self.assertIsNot(compile_query("aw:Name", {'aw': 'http://www.adventure-works.com'}),
+                         compile_query("aw:Name", {'aw': 'http://www.adventure-works.org'}))
+
+    def test_should_compile_explicit_namespaces_query_on_class_creation(self):
+        key = ("aw:ProductName", (('aw', 'http://www.adventure-works.com'),), False)
+        self.assertIn(key, fields._thread_xpath_cache())
+
+
 if __name__ == '__main__':
     unittest.main()
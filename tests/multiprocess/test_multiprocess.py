@@ -0,0 +1,54 @@
+import os
+import pathlib
+import tempfile
+import unittest
+
+from pyxmlmapper import base
+
+xml = """
+<PurchaseOrder OrderDate="1999-10-20">
+  <Address Type="Shipping">
+    <Name>{}</Name>
+  </Address>
+  <Items>
+    <Item><Quantity>1</Quantity></Item>
+    <Item><Quantity>2</Quantity></Item>
+  </Items>
+</PurchaseOrder>
+"""
+
+
+class Address(base.BaseXmlParser):
+    name = base.ValueField("Name")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    address = base.ObjectField("Address", Address)
+    quantities = base.ListValueField(".//Quantity", pytype=int)
+
+
+class TestMapMany(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sources = [xml.format("Name {}".format(i)).encode() for i in range(20)]
+
+    def test_should_keep_order(self):
+        result = list(PurchaseOrder.map_many(self.sources, workers=2, chunksize=3))
+        self.assertEqual(["Name {}".format(i) for i in range(20)], [order['address']['name'] for order in result])
+        self.assertEqual([1, 2], result[0]['quantities'])
+
+    def test_should_return_all_unordered(self):
+        result = list(PurchaseOrder.map_many(self.sources, workers=2, chunksize=3, ordered=False))
+        self.assertEqual(sorted("Name {}".format(i) for i in range(20)),
+                         sorted(order['address']['name'] for order in result))
+
+    def test_should_map_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "order.xml")
+            with open(filename, "w") as fh:
+                fh.write(xml.format("Ellen Adams"))
+            result = list(PurchaseOrder.map_many([pathlib.Path(filename)], workers=1))
+        self.assertEqual([{'address': {'name': 'Ellen Adams'}, 'quantities': [1, 2]}], result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -35,6 +35,14 @@ xml2 = """
 </aw:PurchaseOrder>
 """
 
+xml3 = """
+<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.org">
+  <aw:Address aw:Type="Billing">
+    <aw:Name>John Smith</aw:Name>
+  </aw:Address>
+</aw:PurchaseOrder>
+"""
+
 
 class Address(base.BaseXmlParser):
     name = base.ValueField(".//aw:Name")
@@ -56,6 +64,26 @@ class TestMultithreading(unittest.TestCase):
                 self.assertEqual(f1.result(), "Ellen Adams")
                 self.assertEqual(f2.result(), "Tai Yee")
 
+    def test_each_thread_uses_own_document_namespaces(self):
+        def parse_name(xml): return PurchaseOrder(xml).address_shipping.name
+
+        with ThreadPoolExecutor(50) as executor:
+            for _ in range(200):
+                f1 = executor.submit(parse_name, xml1)
+                f3 = executor.submit(parse_name, xml3)
+                self.assertEqual(f1.result(), "Ellen Adams")
+                self.assertEqual(f3.result(), "John Smith")
+
+    def test_map_concurrent(self):
+        orders = PurchaseOrder.map_concurrent([xml1, xml2, xml3] * 10, max_workers=4)
+        self.assertEqual(["Ellen Adams", "Tai Yee", "John Smith"] * 10, [o.address_shipping.name for o in orders])
+
+    def test_map_concurrent_as_dict_with_executor(self):
+        with ThreadPoolExecutor(4) as executor:
+            orders = PurchaseOrder.map_concurrent([xml2, xml3], executor=executor, as_dict=True)
+        self.assertEqual([{'address_shipping': {'name': 'Tai Yee', 'city': 'Old Town'}},
+                          {'address_shipping': {'name': 'John Smith', 'city': ''}}], orders)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from lxml import etree
+
+from pyxmlmapper import base
+from pyxmlmapper.components.parsers import strip_namespaces
+
+xml = """<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com" aw:OrderDate="1999-10-20">
+  <aw:DeliveryNotes>Please leave packages in shed by driveway.</aw:DeliveryNotes>
+  <aw:Items>
+    <aw:Item aw:PartNumber="872-AA"><aw:ProductName>Lawnmower</aw:ProductName></aw:Item>
+    <aw:Item aw:PartNumber="926-AA"><aw:ProductName>Baby Monitor</aw:ProductName></aw:Item>
+  </aw:Items>
+</aw:PurchaseOrder>"""
+
+xml_default_ns = """<PurchaseOrder xmlns="http://www.adventure-works.com/v2" OrderDate="2001-01-01">
+  <DeliveryNotes>Please ring the bell.</DeliveryNotes>
+  <Items><Item PartNumber="111-AA"><ProductName>Lamp</ProductName></Item></Items>
+</PurchaseOrder>"""
+
+
+class Item(base.BaseXmlParser):
+    __namespaces__ = {"strip": True}
+
+    part_number = base.ValueField("@PartNumber")
+    product_name = base.ValueField("ProductName")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    __namespaces__ = {"strip": True}
+
+    order_date = base.ValueField("@OrderDate")
+    delivery_notes = base.ValueField("DeliveryNotes")
+    items = base.ListObjectField("Items/Item", Item)
+
+
+class Address(base.BaseXmlParser):
+    __namespaces__ = {"strip": True}
+
+    name = base.ValueField("Name")
+    type = base.ValueField("@Type")
+
+
+class NamespacedPurchaseOrder(base.BaseXmlParser):
+    __namespaces__ = {"aw": "http://www.adventure-works.com"}
+
+    address = base.ObjectField("aw:Address", Address)
+    name = base.ValueField("aw:Address/aw:Name")
+    type = base.ValueField("aw:Address/@aw:Type")
+
+
+class PrunedPurchaseOrder(PurchaseOrder):
+    __prune_document__ = True
+
+    items = None
+    delivery_notes = base.ValueField("DeliveryNotes")
+
+
+class TestStripNamespaces(unittest.TestCase):
+    def test_should_replace_tags_and_attributes_with_local_names(self):
+        root = strip_namespaces(etree.fromstring(xml))
+        self.assertEqual([], root.xpath("//*[namespace-uri() != '']"))
+        self.assertEqual("872-AA", root.find("Items/Item").get("PartNumber"))
+
+    def test_should_map_documents_with_different_namespaces(self):
+        for document, part_numbers in ((xml, ["872-AA", "926-AA"]), (xml_default_ns, ["111-AA"])):
+            order = PurchaseOrder(document)
+            self.assertEqual(part_numbers, [item.part_number for item in order.items])
+        self.assertEqual("Please ring the bell.", PurchaseOrder(xml_default_ns).delivery_notes)
+
+    def test_should_use_queries_without_namespaces(self):
+        self.assertEqual({}, vars(PurchaseOrder)["delivery_notes"]._namespaces)
+
+    def test_should_strip_loaded_documents(self):
+        self.assertEqual("1999-10-20", PurchaseOrder.from_bytes(xml.encode()).order_date)
+        self.assertEqual("1999-10-20", PurchaseOrder.extract(etree.fromstring(xml))["order_date"])
+        self.assertEqual(["Lawnmower", "Baby Monitor"],
+                         [item.product_name for item in Item.iterparse(xml.encode(), tag="Item")])
+
+    def test_should_iterparse_qualified_tags(self):
+        for tag in ("aw:Item", "{http://www.adventure-works.com}Item"):
+            self.assertEqual(["872-AA", "926-AA"],
+                             [item.part_number for item in Item.iterparse(xml.encode(), tag=tag)])
+
+    def test_should_not_change_elements_of_caller(self):
+        document = """<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com">
+          <aw:Address aw:Type="Shipping"><aw:Name>Ellen Adams</aw:Name></aw:Address>
+        </aw:PurchaseOrder>"""
+        for read in (lambda order: (order.address.name, order.address.type, order.name, order.type),
+                     lambda order: (order.name, order.type, order.address.name, order.address.type)):
+            self.assertEqual(("Ellen Adams", "Shipping") * 2, read(NamespacedPurchaseOrder(document)))
+        root = etree.fromstring(document)
+        self.assertEqual({"address": {"name": "Ellen Adams", "type": "Shipping"}, "name": "Ellen Adams",
+                          "type": "Shipping"}, NamespacedPurchaseOrder.extract(root))
+        self.assertEqual("{http://www.adventure-works.com}Address", root[0].tag)
+
+    def test_should_stop_pruned_parsing(self):
+        order = PrunedPurchaseOrder.from_bytes(xml.encode())
+        self.assertEqual("Please leave packages in shed by driveway.", order.delivery_notes)
+        self.assertIsNone(order.document.find("Items"))
+
+
+if __name__ == '__main__':
+    unittest.main()
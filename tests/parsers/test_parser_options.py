@@ -0,0 +1,50 @@
+import threading
+import unittest
+
+from lxml import etree
+
+from pyxmlmapper import base
+
+broken_xml = "<PurchaseOrder><DeliveryNotes>Please leave packages</DeliveryNotes>"
+xml = "<PurchaseOrder><!-- comment --><DeliveryNotes>Please leave packages</DeliveryNotes></PurchaseOrder>"
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    delivery_notes = base.ValueField("DeliveryNotes")
+
+
+class StrictPurchaseOrder(PurchaseOrder):
+    __parser_options__ = {"recover": False}
+
+
+class NoCommentsPurchaseOrder(StrictPurchaseOrder):
+    __parser_options__ = {"remove_comments": True}
+
+
+class TestParserOptions(unittest.TestCase):
+    def test_should_recover_by_default(self):
+        self.assertEqual("Please leave packages", PurchaseOrder(broken_xml).delivery_notes)
+
+    def test_should_raise_if_not_recover(self):
+        self.assertRaises(etree.XMLSyntaxError, lambda: StrictPurchaseOrder(broken_xml))
+
+    def test_should_merge_options_of_base_classes(self):
+        self.assertEqual({"recover": True}, PurchaseOrder.parser_options())
+        self.assertEqual({"recover": False, "remove_comments": True}, NoCommentsPurchaseOrder.parser_options())
+        self.assertEqual(1, len(NoCommentsPurchaseOrder(xml).document))
+        self.assertEqual(2, len(StrictPurchaseOrder(xml).document))
+
+    def test_should_reuse_parser_in_thread(self):
+        self.assertIs(PurchaseOrder.xml_parser(), PurchaseOrder.xml_parser())
+        self.assertIsNot(PurchaseOrder.xml_parser(), StrictPurchaseOrder.xml_parser())
+
+    def test_should_create_parser_per_thread(self):
+        parsers = []
+        thread = threading.Thread(target=lambda: parsers.append(PurchaseOrder.xml_parser()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(PurchaseOrder.xml_parser(), parsers[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import io
+import time
+import unittest
+from unittest import mock
+
+from pyxmlmapper import base
+from pyxmlmapper.components import projection
+from pyxmlmapper.components.projection import Projection, parse_path
+
+items = "".join('<aw:Item aw:PartNumber="{0}"><aw:ProductName>Product {0}</aw:ProductName></aw:Item>'.format(i)
+                for i in range(1000))
+xml = """<?xml version="1.0"?>
+<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com" aw:OrderDate="1999-10-20">
+  <aw:Address aw:Type="Shipping"><aw:Name>Ellen Adams</aw:Name><aw:Street>123 Maple Street</aw:Street></aw:Address>
+  <aw:DeliveryNotes>Please leave <aw:b>packages</aw:b> in shed by driveway.</aw:DeliveryNotes>
+  <aw:Items>{}</aw:Items>
+  <aw:Trailer>end</aw:Trailer>
+</aw:PurchaseOrder>""".format(items).encode()
+
+
+class Address(base.BaseXmlParser):
+    name = base.ValueField("aw:Name")
+
+
+class Header(base.BaseXmlParser):
+    __prune_document__ = True
+
+    order_date = base.DateTimeField("@aw:OrderDate")
+    address = base.ObjectField("aw:Address", Address)
+    delivery_notes = base.ListValueField("aw:DeliveryNotes/text()")
+
+
+class SingleHeader(Header):
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+
+
+class TextHeader(SingleHeader):
+    delivery_notes = base.ValueField("aw:DeliveryNotes/text()")
+
+
+class Trailer(base.BaseXmlParser):
+    __prune_document__ = True
+
+    trailer = base.ValueField("aw:Trailer")
+    part_numbers = base.ListValueField("aw:Items/aw:Item/@aw:PartNumber")
+
+
+class Search(base.BaseXmlParser):
+    __prune_document__ = True
+
+    names = base.ListValueField(".//aw:ProductName")
+
+
+class TestProjection(unittest.TestCase):
+    def test_should_parse_simple_paths(self):
+        self.assertEqual((["Items", "Item"], "attribute"), parse_path("aw:Items/aw:Item/@aw:PartNumber"))
+        self.assertEqual((["Name"], "text"), parse_path("./Name/text()"))
+        self.assertIsNone(parse_path(".//aw:ProductName"))
+        self.assertIsNone(parse_path("aw:Item[1]"))
+        self.assertIsNone(parse_path("count(aw:Item)"))
+
+    def test_should_not_build_projection_for_complex_queries(self):
+        self.assertIsNone(Search.projection())
+        self.assertEqual(1000, len(Search.from_bytes(xml).names))
+
+    def test_should_stop_when_single_fields_are_resolved(self):
+        header = SingleHeader.from_bytes(xml)
+        self.assertEqual("Ellen Adams", header.address.name)
+        self.assertEqual("Please leave ", header.delivery_notes)
+        self.assertEqual(1999, header.order_date.year)
+        self.assertIsNone(header.document.find("{http://www.adventure-works.com}Trailer"))
+        self.assertLess(len(header.document.xpath("//*")), 50)
+
+    def test_should_prune_unreachable_elements(self):
+        header = TextHeader.from_stream(io.BytesIO(xml))
+        self.assertEqual("Please leave ", header.delivery_notes)
+        self.assertEqual(["Please leave ", " in shed by driveway."],
+                         header.document.xpath("//*[local-name()='DeliveryNotes']/text()"))
+        self.assertEqual([], header.document.xpath("//*[local-name()='Item']"))
+        self.assertEqual([], header.document.xpath("//*[local-name()='Street']"))
+
+    def test_should_parse_documents_of_list_models_completely(self):
+        for model in (Header, Trailer):
+            self.assertFalse(model.projection().terminates)
+            instance = model.from_stream(io.BytesIO(xml))
+            self.assertEqual(1000, len(instance.document.xpath("//*[local-name()='ProductName']")))
+        self.assertEqual(["Please leave ", " in shed by driveway."], Header.from_bytes(xml).delivery_notes.all())
+        self.assertEqual(1000, len(Trailer.from_bytes(xml).part_numbers))
+
+    def test_should_return_the_same_values_as_full_parse(self):
+        for model in (Header, SingleHeader, TextHeader, Trailer):
+            self.assertIsNotNone(model.projection())
+            self.assertEqual(model.extract(model.parse(xml.decode().split("?>", 1)[1])), model.extract(xml))
+
+    def test_should_not_terminate_on_missing_fields(self):
+        class Missing(base.BaseXmlParser):
+            __prune_document__ = True
+            missing = base.ValueField("aw:Missing", default="-")
+            trailer = base.ValueField("aw:Trailer")
+
+        self.assertEqual({"missing": "-", "trailer": "end"}, Missing.extract(xml))
+        self.assertFalse(Projection.from_model(Missing).terminates is False)
+
+    def test_should_check_fields_logarithmic_number_of_times(self):
+        class Missing(base.BaseXmlParser):
+            __prune_document__ = True
+            missing = base.ValueField("aw:Items/aw:Item/@aw:Missing")
+
+        resolved = projection._Resolver.resolved
+        with mock.patch.object(projection._Resolver, "resolved", autospec=True, side_effect=resolved) as check:
+            self.assertEqual(1000, len(Missing.from_bytes(xml).document.find("{*}Items")))
+        # the parsed part grows CHECK_GROWTH times between the checks
+        self.assertLessEqual(check.call_count, 6)
+
+    def test_should_parse_in_linear_time(self):
+        class Missing(base.BaseXmlParser):
+            __prune_document__ = True
+            missing = base.ValueField("aw:Items/aw:Item/@aw:Missing")
+            trailer = base.ValueField("aw:Trailer")
+
+        def document(size):
+            return xml.replace(items.encode(), items.encode() * size)
+
+        def parse_time(document):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                Missing.from_bytes(document)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        small, large = document(2), document(16)
+        # quadratic parsing would take 64 times longer
+        self.assertLess(parse_time(large) / parse_time(small), 24)
+
+
+if __name__ == '__main__':
+    unittest.main()
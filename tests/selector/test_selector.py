@@ -1,7 +1,7 @@
 import unittest
 
 from pyxmlmapper.components.common import Default
-from pyxmlmapper.components.selector import Selector
+from pyxmlmapper.components.selector import LazySelector, Selector
 
 
 class TestSelector(unittest.TestCase):
@@ -37,5 +37,38 @@ class TestSelector(unittest.TestCase):
         self.assertSequenceEqual(self.iterable, Selector(self.iterable).all())
 
 
+class TestLazySelector(unittest.TestCase):
+    def setUp(self) -> None:
+        self.converted = []
+        self.selector = LazySelector(["0", "1", "2"], self.convert, 5)
+
+    def convert(self, item):
+        self.converted.append(item)
+        return int(item)
+
+    def test_should_convert_items_on_demand(self):
+        self.assertEqual(3, len(self.selector))
+        self.assertEqual(2, self.selector[-1])
+        self.assertEqual(0, self.selector.first())
+        self.assertEqual(["2", "0"], self.converted)
+
+    def test_should_convert_item_once(self):
+        self.assertEqual(1, self.selector.item(1))
+        self.assertEqual([1, 2], self.selector[1:])
+        self.assertEqual([0, 1, 2], list(self.selector))
+        self.assertEqual([0, 1, 2], self.selector.all())
+        self.assertEqual(["1", "2", "0"], self.converted)
+
+    def test_should_support_slices(self):
+        self.assertEqual([0, 2], self.selector[::2])
+        self.assertEqual([], self.selector[5:])
+        self.assertEqual(["0", "2"], self.converted)
+
+    def test_should_return_default(self):
+        self.assertEqual(Default(5), self.selector.item(5))
+        self.assertEqual(Default(5), LazySelector([], self.convert, 5).first())
+        self.assertEqual(Default(5), LazySelector([], self.convert, 5).last())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,136 @@
+import io
+import json
+import pathlib
+import tempfile
+import tracemalloc
+import unittest
+from decimal import Decimal
+from unittest import mock
+
+from pyxmlmapper import base
+from pyxmlmapper.components import serialization
+
+order = b"""<PurchaseOrder xmlns="urn:po" Number="1">
+    <Created>2019-08-29T10:00:00</Created><Total>10.50</Total>
+    <Customer><Name>Ann</Name></Customer>
+    <Items>
+        <Item Sku="a"><Price>1.5</Price><Tag>x</Tag><Tag>y</Tag></Item>
+        <Item Sku="b"><Price>2</Price></Item>
+    </Items>
+</PurchaseOrder>"""
+
+
+class Item(base.BaseXmlParser):
+    sku = base.ValueField("@Sku")
+    price = base.ValueField("ns:Price", pytype=Decimal)
+    tags = base.ListValueField("ns:Tag")
+
+
+class Customer(base.BaseXmlParser):
+    name = base.ValueField("ns:Name")
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    number = base.ValueField("@Number", pytype=int)
+    created = base.DateTimeField("ns:Created")
+    total = base.ValueField("ns:Total", pytype=Decimal)
+    customer = base.ObjectField("ns:Customer", Customer)
+    supplier = base.ObjectField("ns:Supplier", Customer)
+    items = base.ListObjectField("ns:Items/ns:Item", Item)
+    prices = base.ListValueField("ns:Items/ns:Item/ns:Price", pytype=float)
+    by_sku = base.MapField("ns:Items/ns:Item", Item, key="@Sku")
+
+
+class FlatItem(base.BaseXmlParser):
+    __namespaces__ = {"po": "urn:po"}
+    sku = base.ValueField("@Sku")
+
+
+class Items(base.BaseXmlParser):
+    __namespaces__ = {"po": "urn:po"}
+    items = base.ListObjectField("po:Items/po:Item", FlatItem)
+
+
+def dump(model, **kwargs):
+    fp = io.StringIO()
+    model.dump_json(fp, **kwargs)
+    return fp.getvalue()
+
+
+class TestDumpJson(unittest.TestCase):
+    def test_should_write_extracted_fields(self):
+        expected = json.dumps(PurchaseOrder.extract(order), cls=serialization.JSONEncoder, separators=(",", ":"))
+        self.assertEqual(expected, dump(PurchaseOrder(order)))
+
+    def test_should_encode_dates_and_decimals(self):
+        result = json.loads(dump(PurchaseOrder(order)))
+        self.assertEqual("2019-08-29T10:00:00", result["created"])
+        self.assertEqual("10.50", result["total"])
+        self.assertEqual(["1.5", "2"], [item["price"] for item in result["items"]])
+        self.assertEqual("", result["supplier"])
+        self.assertEqual(["a", "b"], list(result["by_sku"]))
+
+    def test_should_write_selected_fields(self):
+        result = json.loads(dump(PurchaseOrder(order), fields=["number", "items.sku", "items.tags"]))
+        self.assertEqual({"number": 1, "items": [{"sku": "a", "tags": ["x", "y"]}, {"sku": "b", "tags": []}]},
+                         result)
+
+    def test_should_reject_unknown_fields(self):
+        self.assertRaises(ValueError, lambda: dump(PurchaseOrder(order), fields=["missing"]))
+        self.assertRaises(ValueError, lambda: dump(PurchaseOrder(order), fields=["number.value"]))
+
+    def test_should_write_empty_model(self):
+        self.assertEqual('{"number":"","items":[]}', dump(PurchaseOrder(), fields=["number", "items"]))
+
+    def test_should_walk_simple_paths_without_xpath(self):
+        doc = Items.parse(order)
+        nodes = serialization.iter_nodes(Items.items, doc)
+        self.assertNotIsInstance(nodes, list)
+        self.assertEqual(["a", "b"], [node.get("Sku") for node in nodes])
+
+    def test_should_keep_memory_flat(self):
+        def peak(count):
+            xml = '<PurchaseOrder xmlns="urn:po"><Items>{}</Items></PurchaseOrder>'.format(
+                '<Item Sku="{}"/>' * count).format(*range(count)).encode()
+            model = Items(xml)
+            tracemalloc.start()
+            try:
+                model.dump_json(_Sink())
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        # pieces are buffered up to CHUNK_SIZE, the peak doesn't grow after that
+        with mock.patch.object(serialization, "CHUNK_SIZE", 1024):
+            peak(100)  # queries are compiled
+            small, large = peak(2000), peak(10000)
+        self.assertLess(large, small * 1.2)
+
+
+class _Sink:
+    def write(self, text):
+        pass
+
+
+class TestNdjson(unittest.TestCase):
+    def test_should_write_a_line_per_document(self):
+        fp = io.StringIO()
+        PurchaseOrder.dump_ndjson(fp, [order, PurchaseOrder.parse(order)], fields=["number"])
+        self.assertEqual('{"number":1}\n{"number":1}\n', fp.getvalue())
+
+    def test_should_take_documents_as_extract(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory, "order.xml")
+            path.write_bytes(order)
+            fp = io.StringIO()
+            PurchaseOrder.dump_ndjson(fp, [order.decode(), path], fields=["number"])
+            self.assertEqual(PurchaseOrder.extract(path), PurchaseOrder.extract(order.decode()))
+        self.assertEqual('{"number":1}\n{"number":1}\n', fp.getvalue())
+
+    def test_should_join_pieces_into_chunks(self):
+        chunks = list(serialization.join_chunks(["ab", "c", "de", "f"], size=3))
+        self.assertEqual(["abc", "def"], chunks)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import tempfile
+import unittest
+
+from pyxmlmapper import base
+from pyxmlmapper.components.sources import BufferReader
+
+xml = '<?xml version="1.0" encoding="windows-1251"?><PurchaseOrder><Name>Заказ</Name>' \
+      '</PurchaseOrder>'.encode("windows-1251")
+compressors = {".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    name = base.ValueField("Name")
+
+
+class TestSources(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, filename, content):
+        path = os.path.join(self.tmp_dir.name, filename)
+        with open(path, "wb") as fh:
+            fh.write(content)
+        return path
+
+    def test_should_parse_file_with_encoding_declaration(self):
+        path = self.write("order.xml", xml)
+        self.assertEqual("Заказ", PurchaseOrder.from_file(path).name)
+
+    def test_should_parse_compressed_files(self):
+        for extension, compress in compressors.items():
+            path = self.write("order.xml" + extension, compress(xml))
+            self.assertEqual("Заказ", PurchaseOrder.from_file(path).name, extension)
+
+    def test_should_parse_buffers(self):
+        for buffer in (xml, bytearray(xml), memoryview(xml)):
+            self.assertEqual("Заказ", PurchaseOrder.from_bytes(buffer).name)
+
+    def test_should_parse_mmap(self):
+        path = self.write("order.xml.gz", gzip.compress(xml))
+        with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            self.assertEqual("Заказ", PurchaseOrder.from_bytes(buffer).name)
+
+    def test_should_parse_compressed_bytes(self):
+        for extension, compress in compressors.items():
+            self.assertEqual("Заказ", PurchaseOrder.from_bytes(compress(xml)).name, extension)
+
+    def test_should_parse_streams(self):
+        self.assertEqual("Заказ", PurchaseOrder.from_stream(io.BytesIO(xml)).name)
+        for extension, compress in compressors.items():
+            stream = io.BufferedReader(io.BytesIO(compress(xml)))
+            self.assertEqual("Заказ", PurchaseOrder.from_stream(stream).name, extension)
+
+    def test_buffer_reader_should_read_by_chunks(self):
+        reader = BufferReader(memoryview(xml))
+        chunks = iter(lambda: reader.read(10), b"")
+        self.assertEqual(xml, b"".join(chunks))
@@ -0,0 +1,82 @@
+import unittest
+
+from pyxmlmapper import base, stats
+
+xml = """
+<PurchaseOrder OrderDate="1999-10-20">
+  <DeliveryNotes>Please leave packages in shed by driveway.</DeliveryNotes>
+  <Items>
+    <Item><Quantity>1</Quantity></Item>
+    <Item><Quantity>2</Quantity></Item>
+  </Items>
+</PurchaseOrder>
+"""
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    order_date = base.DateTimeField("@OrderDate")
+    delivery_notes = base.ValueField("DeliveryNotes", cache=True)
+    quantities = base.ListValueField(".//Quantity", pytype=int)
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self) -> None:
+        stats.reset()
+        stats.enable()
+
+    def tearDown(self) -> None:
+        stats.disable()
+        stats.reset()
+
+    def test_should_count_queries(self):
+        order = PurchaseOrder(xml)
+        order.quantities.all()
+        order.quantities.all()
+        result = stats.snapshot()["PurchaseOrder.quantities"]
+        self.assertEqual(2, result["count"])
+        self.assertEqual(4, result["results"])
+        self.assertEqual(2, result["max_results"])
+        self.assertGreater(result["query_time"], 0)
+        self.assertGreaterEqual(result["query_time"], result["max_query_time"])
+        self.assertGreater(result["convert_time"], 0)
+
+    def test_should_count_date_conversions(self):
+        PurchaseOrder(xml).order_date
+        self.assertGreater(stats.snapshot()["PurchaseOrder.order_date"]["convert_time"], 0)
+
+    def test_should_count_cache_hits(self):
+        order = PurchaseOrder(xml)
+        for _ in range(3):
+            order.delivery_notes
+        result = stats.snapshot()["PurchaseOrder.delivery_notes"]
+        self.assertEqual(1, result["count"])
+        self.assertEqual(2, result["cache_hits"])
+        self.assertEqual(1, result["cache_misses"])
+
+    def test_should_call_callbacks(self):
+        metrics = []
+
+        def callback(name, metric, value):
+            metrics.append((name, metric))
+
+        stats.add_callback(callback)
+        try:
+            PurchaseOrder.extract(xml)
+        finally:
+            stats.remove_callback(callback)
+        self.assertIn(("PurchaseOrder.quantities", "query_time"), metrics)
+        self.assertIn(("PurchaseOrder.quantities", "results"), metrics)
+
+    def test_should_reset(self):
+        PurchaseOrder(xml).quantities
+        stats.reset()
+        self.assertEqual({}, stats.snapshot())
+
+    def test_should_not_record_if_disabled(self):
+        stats.disable()
+        PurchaseOrder(xml).quantities
+        self.assertEqual({}, stats.snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from pyxmlmapper import base
+from tests.streaming.test_iterparse import AutoNsItem, DefaultNsItem, Item, xml, xml_default_ns, xml_root_item
+
+
+class PurchaseOrder(base.BaseXmlParser):
+    delivery_notes = base.ValueField("aw:DeliveryNotes")
+    items = base.ListObjectField("aw:Items/aw:Item", AutoNsItem)
+
+
+async def chunked(data, size=50):
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+
+async def collect(async_iterable):
+    return [item async for item in async_iterable]
+
+
+class TestAsync(unittest.TestCase):
+    def test_should_parse_document_from_chunks(self):
+        order = asyncio.run(PurchaseOrder.afrom_chunks(chunked(xml)))
+        self.assertEqual("Please leave packages in shed by driveway.", order.delivery_notes)
+        self.assertEqual([1, 2, 3], [item.quantity for item in order.items])
+
+    def test_should_accept_sync_iterable_and_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            order = asyncio.run(PurchaseOrder.afrom_chunks([xml[:100], xml[100:]], executor=executor))
+        self.assertEqual(3, len(order.items))
+
+    def test_should_yield_models(self):
+        async def names():
+            return [item.product_name async for item in Item.aiterparse(chunked(xml), tag="aw:Item")]
+        self.assertEqual(['Lawnmower', 'Baby Monitor', 'Lamp'], asyncio.run(names()))
+
+    def test_should_yield_dicts(self):
+        items = asyncio.run(collect(AutoNsItem.aiterparse(chunked(xml), tag="aw:Item", as_dict=True)))
+        self.assertEqual([1, 2, 3], [item['quantity'] for item in items])
+
+    def test_should_resolve_default_namespace(self):
+        items = asyncio.run(collect(DefaultNsItem.aiterparse(chunked(xml_default_ns, 7), tag="ns:Item", as_dict=True)))
+        self.assertEqual(['Lawnmower', 'Baby Monitor'], [item['product_name'] for item in items])
+
+    def test_should_yield_root_after_comments(self):
+        items = asyncio.run(collect(Item.aiterparse(chunked(xml_root_item, 10), tag="aw:Item", as_dict=True)))
+        self.assertEqual(['Lawnmower'], [item['product_name'] for item in items])
+
+    def test_should_yield_record_before_document_is_received(self):
+        received = []
+
+        async def chunks():
+            for chunk in (xml[:400], xml[400:]):
+                received.append(chunk)
+                yield chunk
+
+        async def first():
+            async for item in Item.aiterparse(chunks(), tag="aw:Item"):
+                return item.product_name, len(received)
+        self.assertEqual(("Lawnmower", 1), asyncio.run(first()))
+
+
+if __name__ == '__main__':
+    unittest.main()
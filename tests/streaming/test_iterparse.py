@@ -0,0 +1,96 @@
+import pathlib
+import tempfile
+import unittest
+
+from pyxmlmapper import base
+
+xml = b"""<?xml version="1.0" encoding="utf-8"?>
+<aw:PurchaseOrder xmlns:aw="http://www.adventure-works.com">
+  <aw:DeliveryNotes>Please leave packages in shed by driveway.</aw:DeliveryNotes>
+  <aw:Items>
+    <aw:Item aw:PartNumber="872-AA">
+      <aw:ProductName>Lawnmower</aw:ProductName>
+      <aw:Quantity>1</aw:Quantity>
+    </aw:Item>
+    <aw:Item aw:PartNumber="926-AA">
+      <aw:ProductName>Baby Monitor</aw:ProductName>
+      <aw:Quantity>2</aw:Quantity>
+    </aw:Item>
+    <aw:Item aw:PartNumber="111-AA">
+      <aw:ProductName>Lamp</aw:ProductName>
+      <aw:Quantity>3</aw:Quantity>
+    </aw:Item>
+  </aw:Items>
+</aw:PurchaseOrder>
+"""
+
+xml_default_ns = b"""
+<PurchaseOrder xmlns="http://www.adventure-works.com">
+  <Items>
+    <Item PartNumber="872-AA"><ProductName>Lawnmower</ProductName></Item>
+    <Item PartNumber="926-AA"><ProductName>Baby Monitor</ProductName></Item>
+  </Items>
+</PurchaseOrder>
+"""
+
+
+xml_root_item = b"""<?xml version="1.0"?>
+<!-- c --><?pi x?><aw:Item xmlns:aw="http://www.adventure-works.com" aw:PartNumber="872-AA">
+  <aw:ProductName>Lawnmower</aw:ProductName>
+</aw:Item>"""
+
+
+class Item(base.BaseXmlParser):
+    __namespaces__ = {'aw': 'http://www.adventure-works.com'}
+
+    product_name = base.ValueField("aw:ProductName")
+    part_number = base.ValueField("@aw:PartNumber")
+    quantity = base.ValueField("aw:Quantity", pytype=int)
+
+
+class AutoNsItem(base.BaseXmlParser):
+    product_name = base.ValueField("aw:ProductName")
+    quantity = base.ValueField("aw:Quantity", pytype=int)
+
+
+class DefaultNsItem(base.BaseXmlParser):
+    product_name = base.ValueField("ns:ProductName")
+
+
+class TestIterparse(unittest.TestCase):
+    def test_should_yield_models(self):
+        names = [item.product_name for item in Item.iterparse(xml, tag="aw:Item")]
+        self.assertEqual(['Lawnmower', 'Baby Monitor', 'Lamp'], names)
+
+    def test_should_yield_dicts(self):
+        items = list(Item.iterparse(xml, tag="{http://www.adventure-works.com}Item", as_dict=True))
+        self.assertEqual({'product_name': 'Baby Monitor', 'part_number': '926-AA', 'quantity': 2}, items[1])
+
+    def test_should_resolve_prefix_with_document_namespaces(self):
+        quantities = [item['quantity'] for item in AutoNsItem.iterparse(xml, tag="aw:Item", as_dict=True)]
+        self.assertEqual([1, 2, 3], quantities)
+
+    def test_should_resolve_default_namespace(self):
+        names = [item.product_name for item in DefaultNsItem.iterparse(xml_default_ns, tag="ns:Item")]
+        self.assertEqual(['Lawnmower', 'Baby Monitor'], names)
+
+    def test_should_yield_root_after_comments(self):
+        items = list(Item.iterparse(xml_root_item, tag="aw:Item", as_dict=True))
+        self.assertEqual([{'product_name': 'Lawnmower', 'part_number': '872-AA', 'quantity': ''}], items)
+
+    def test_should_take_documents_like_parse(self):
+        latin1 = xml.replace(b'encoding="utf-8"', b'encoding="iso-8859-1"').replace(b'Lamp', 'L\xe4mp'.encode('latin1'))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = pathlib.Path(tmp_dir, "orders.xml")
+            path.write_bytes(latin1)
+            for source in (latin1, memoryview(latin1), latin1.decode('latin1'), path):
+                names = [item.product_name for item in Item.iterparse(source, tag="aw:Item")]
+                self.assertEqual(['Lawnmower', 'Baby Monitor', 'L\xe4mp'], names)
+
+    def test_should_clear_processed_elements(self):
+        for item in Item.iterparse(xml, tag="aw:Item"):
+            self.assertIsNone(item.document.getprevious())
+
+
+if __name__ == '__main__':
+    unittest.main()
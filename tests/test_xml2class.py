@@ -0,0 +1,68 @@
+# -*- coding: utf8 -*-
+
+import unittest
+from io import BytesIO
+
+from pyxmlmapper import xml2class
+
+xml = """
+<aw:PurchaseOrder aw:OrderDate="1999-10-20" xmlns:aw="http://www.adventure-works.com">
+  <aw:Address aw:Type="Shipping">
+    <aw:Name>Ellen Adams</aw:Name>
+  </aw:Address>
+  <aw:Address aw:Type="Billing">
+    <aw:Name>Tai Yee</aw:Name>
+    <aw:City>Old Town</aw:City>
+  </aw:Address>
+  <aw:DeliveryNotes>Please leave packages
+    in shed by driveway.</aw:DeliveryNotes>
+  <aw:Phone>1</aw:Phone>
+  <aw:Phone>2</aw:Phone>
+</aw:PurchaseOrder>
+"""
+
+
+class TestBuildTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tree = xml2class.build_tree(BytesIO(xml.encode()))
+
+    def test_should_merge_same_elements(self):
+        self.assertEqual(['Address', 'DeliveryNotes', 'Phone'], [node.name for node in self.tree.children])
+        address = self.tree.get_child('aw:Address')
+        self.assertEqual(['Name', 'City'], [node.name for node in address.children])
+
+    def test_should_mark_repeated_elements(self):
+        self.assertTrue(self.tree.get_child('aw:Address').repeated)
+        self.assertTrue(self.tree.get_child('aw:Phone').repeated)
+        self.assertFalse(self.tree.get_child('aw:DeliveryNotes').repeated)
+        self.assertFalse(self.tree.get_child('aw:Address').get_child('aw:Name').repeated)
+
+    def test_should_keep_paths(self):
+        self.assertEqual('aw:Address/aw:City', self.tree.get_child('aw:Address').get_child('aw:City').path)
+        self.assertEqual('aw:City', self.tree.get_child('aw:Address').get_child('aw:City').relative_path)
+
+    def test_should_build_same_tree_from_parsed_document(self):
+        from_string = xml2class.create_classes_from_string(xml)
+        from_file = xml2class.create_classes_from_file(BytesIO(xml.encode()))
+        self.assertEqual(from_string, from_file)
+
+    def test_should_skip_comments_before_root(self):
+        document = '<?xml version="1.0"?>\n<?xml-stylesheet href="order.xsl"?><!-- c -->' + xml.strip()
+        self.assertEqual(xml2class.create_classes_from_string(xml),
+                         xml2class.create_classes_from_file(BytesIO(document.encode())))
+
+
+class TestCodeBuilder(unittest.TestCase):
+    def test_should_create_compilable_models(self):
+        code = xml2class.create_classes_from_string(xml)
+        self.assertIn("Addresss: List[Address] = base.ListObjectField('./aw:Address', Address, default=Address())", code)
+        self.assertIn("Phones = base.ListValueField('./aw:Phone')  # 1", code)
+        namespace = {}
+        exec(code, namespace)
+        order = namespace['PurchaseOrder'](xml)
+        self.assertEqual(['Ellen Adams', 'Tai Yee'], [address.Name for address in order.Addresss])
+        self.assertEqual(['1', '2'], order.Phones.all())
+
+
+if __name__ == '__main__':
+    unittest.main()
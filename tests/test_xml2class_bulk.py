@@ -0,0 +1,100 @@
+# -*- coding: utf8 -*-
+
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from pyxmlmapper import xml2class_bulk
+
+xml = """<PurchaseOrder>
+  <Address>
+    <Name>{}</Name>
+  </Address>
+</PurchaseOrder>
+"""
+
+
+class TestXml2ClassBulk(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.in_dir = os.path.join(self.directory.name, "in")
+        self.out_dir = os.path.join(self.directory.name, "out")
+        os.mkdir(self.in_dir)
+        os.mkdir(self.out_dir)
+        with zipfile.ZipFile(os.path.join(self.in_dir, "orders.zip"), "w") as xml_zip:
+            for i in range(4):
+                xml_zip.writestr("order{}.xml".format(i), xml.format(i))
+            xml_zip.writestr("readme.txt", "")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def process(self, workers, incremental=False):
+        with redirect_stdout(StringIO()):
+            xml2class_bulk.process(os.path.join(self.in_dir, "*.zip"), self.out_dir, from_zip=True,
+                                   workers=workers, incremental=incremental)
+        result = {}
+        for filename in sorted(os.listdir(self.out_dir)):
+            with open(os.path.join(self.out_dir, filename), encoding="utf8") as fh:
+                result[filename] = fh.read()
+        return result
+
+    def test_should_create_models_for_zip_members(self):
+        result = self.process(workers=1)
+        self.assertEqual(["order{}.xml.py".format(i) for i in range(4)], list(result))
+        self.assertIn("class Address(base.BaseXmlParser):", result["order0.xml.py"])
+
+    def test_should_open_archive_once_per_batch(self):
+        batch = [(os.path.join(self.in_dir, "orders.zip"), "order{}.xml".format(i)) for i in range(4)]
+        with mock.patch.object(zipfile.ZipFile, "close", autospec=True, side_effect=zipfile.ZipFile.close) as close:
+            results = xml2class_bulk.create_structure_models([(source, None) for source in batch])
+            self.assertEqual(1, close.call_count)
+        self.assertEqual(1, len({result["fingerprint"] for result in results}))
+
+    def test_should_read_member_once(self):
+        source = (os.path.join(self.in_dir, "orders.zip"), "order0.xml")
+        with mock.patch.object(zipfile.ZipFile, "open", autospec=True, side_effect=zipfile.ZipFile.open) as open_:
+            result, = xml2class_bulk.create_structure_models([(source, None)])
+            self.assertEqual(1, open_.call_count)
+        self.assertIsNotNone(result["models"])
+
+    def test_should_split_archive_members_into_batches(self):
+        sources = [("a.zip", str(i)) for i in range(10)] + [("b.zip", "0")]
+        batches = list(xml2class_bulk.iter_batches(sources, workers=1))
+        self.assertEqual([3, 3, 3, 1, 1], [len(batch) for batch in batches])
+        self.assertEqual(["b.zip"], [archive for archive, _ in batches[-1]])
+
+    def test_workers_should_create_same_models(self):
+        self.assertEqual(self.process(workers=1), self.process(workers=2))
+
+    def test_incremental_should_create_module_per_structure(self):
+        result = self.process(workers=1, incremental=True)
+        modules = [filename for filename in result if filename.startswith("schema_")]
+        self.assertEqual(1, len(modules))
+        manifest = json.loads(result["manifest.json"])["files"]
+        self.assertEqual(4, len(manifest))
+        self.assertEqual({modules[0][:-3]}, {item["module"] for item in manifest.values()})
+
+    def test_incremental_should_skip_not_changed_files(self):
+        self.process(workers=1, incremental=True)
+        with zipfile.ZipFile(os.path.join(self.in_dir, "orders.zip"), "a") as xml_zip:
+            xml_zip.writestr("other.xml", "<Order><Number>1</Number></Order>")
+        output = StringIO()
+        with redirect_stdout(output):
+            xml2class_bulk.process(os.path.join(self.in_dir, "*.zip"), self.out_dir, from_zip=True, incremental=True)
+        self.assertEqual(4, output.getvalue().count("not changed"))
+        with open(os.path.join(self.out_dir, "manifest.json"), encoding="utf8") as fh:
+            manifest = json.load(fh)["files"]
+        self.assertEqual(2, len({item["module"] for item in manifest.values()}))
+
+    def test_incremental_workers_should_create_same_modules(self):
+        self.assertEqual(self.process(workers=2, incremental=True), self.process(workers=1, incremental=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -127,6 +127,23 @@ class TextXmlParserListFields(unittest.TestCase):
         self.assertEqual(self.obj.typed_prices.all(), [148.95, 39.98])
 
 
+class TestXmlParserExtract(unittest.TestCase):
+    def test_should_extract_all_fields(self):
+        result = PurchaseOrderXmlParser.extract(xml)
+        self.assertEqual(['order_date', 'address_shipping', 'address_billing', 'delivery_notes', 'items'],
+                         list(result))
+        self.assertEqual(datetime(1999, 10, 20), result['order_date'])
+        self.assertEqual({'name': 'Tai Yee', 'city': 'Old Town'}, result['address_billing'])
+        self.assertEqual({'product_name': 'Baby Monitor', 'part_number': '926-AA', 'quantity': 2, 'us_price': 39.98},
+                         result['items'][1])
+
+    def test_to_dict_should_be_equal_to_extract(self):
+        self.assertEqual(PurchaseItemsXmlParser.extract(xml), PurchaseItemsXmlParser(xml).to_dict())
+
+    def test_should_extract_defaults(self):
+        self.assertEqual({'address': None}, AddressContainerWithWrongQuery.extract(xml))
+
+
 class TestXmlParserNotFoundCases(unittest.TestCase):
 
     def setUp(self):
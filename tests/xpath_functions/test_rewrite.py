@@ -0,0 +1,82 @@
+import unittest
+
+from lxml import etree
+
+from pyxmlmapper import base
+from pyxmlmapper.components import xpath_functions
+from pyxmlmapper.components.xpath_functions import rewrite
+
+xml = """
+<PurchaseOrder xmlns="http://www.adventure-works.com" xmlns:aw="http://www.adventure-works.com/aw">
+  <Items>
+    <aw:Item><ProductName>Lawnmower</ProductName></aw:Item>
+    <Item><product_name>Baby Monitor</product_name></Item>
+    <Item><PRODUCTNAME>Lamp</PRODUCTNAME><Заказ>1</Заказ></Item>
+  </Items>
+</PurchaseOrder>
+"""
+
+queries = [
+    ".//*[tag()='ProductName']",
+    ".//*[match(tag(), 'ProductName', 'product_name')]",
+    ".//*[lower(tag())='productname']",
+    ".//*[lower(tag())='заказ']",
+    ".//*['productname' = lower(tag())]",
+    ".//*[lower(tag()) != 'productname']",
+    ".//*[lower(tag())='ProductName']",
+    ".//*[match(lower(tag()), 'productname', 'item')]",
+    ".//*[starts-with(lower(tag()), 'product')]",
+    ".//*[match(tag(), 'Item')]/*[tag() = 'ProductName' or tag()=\"product_name\"]",
+]
+
+
+class TestRewrite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.doc = etree.fromstring(xml)
+
+    def test_should_return_the_same_as_callbacks(self):
+        for query in queries:
+            self.assertNotIn("tag()", rewrite(query))
+            self.assertEqual(etree.XPath(query)(self.doc), etree.XPath(rewrite(query))(self.doc), query)
+
+    def test_should_translate_only_letters_of_compared_literals(self):
+        self.assertEqual(".//*[translate(local-name(), 'AEMN', 'aemn')='name']", rewrite(".//*[lower(tag())='name']"))
+
+    def test_should_lower_letters_as_str_lower(self):
+        doc = etree.fromstring("<Root><ŁÓDŹ/><ŐRSÉG/><ŽIŽKA/><ΟΔΟΣ/><ΟΔΟΣΑ/><İ/><Kelvin/></Root>")
+        for name in ("łódź", "őrség", "žižka", "οδος", "οδοσ", "οδοσα", "i̇", "i", "kelvin"):
+            query = "*[lower(tag())='{}']".format(name)
+            self.assertEqual(etree.XPath(query)(doc), etree.XPath(rewrite(query))(doc), query)
+        self.assertEqual("*[lower(local-name())='οδος']", rewrite("*[lower(tag())='οδος']"))
+        self.assertEqual("*[starts-with(lower(local-name()), 'ł')]", rewrite("*[starts-with(lower(tag()), 'ł')]"))
+
+    def test_should_not_rewrite_literals_and_other_functions(self):
+        for query in ("x[@a='tag()']", 'x[@a="match(tag(), 1)"]', "aw:tag()", "my-tag()", "tag(1)", "lower(1, 2)"):
+            self.assertEqual(query, rewrite(query))
+
+    def test_should_keep_match_of_nodes_and_numbers(self):
+        doc = etree.fromstring("<Root><x t='a'>a</x><x t='b'>1</x></Root>")
+        for query in ("x[match(@t, 'a')]", "x[match(., 'a')]", "x[match(text(), 'a', '1')]", "x[match(tag(), @t)]",
+                      "x[match(string(@t), 1)]", "x[match(string(@t), 'a')]", "x[match(concat(@t, .), 'b1')]"):
+            self.assertEqual(etree.XPath(query)(doc), etree.XPath(rewrite(query))(doc), query)
+        for query in ("x[match(@t, 'a')]", "x[match(., 'a')]", "x[match(tag(), @t)]", "x[match(string(@t), 1)]"):
+            self.assertEqual(query.replace("tag()", "local-name()"), rewrite(query))
+
+    def test_should_keep_user_functions(self):
+        @xpath_functions.ns
+        def lower(context, a):
+            return a.lower()
+        try:
+            self.assertEqual(".//*[lower(local-name())='productname']", rewrite(".//*[lower(tag())='productname']"))
+        finally:
+            xpath_functions.ns["lower"] = xpath_functions.lower
+
+    def test_fields_should_use_rewritten_queries(self):
+        class PurchaseOrder(base.BaseXmlParser):
+            names = base.ListValueField(".//*[match(tag(), 'ProductName', 'product_name')]")
+
+        self.assertEqual(["Lawnmower", "Baby Monitor"], PurchaseOrder(xml).names.all())
+
+
+if __name__ == '__main__':
+    unittest.main()